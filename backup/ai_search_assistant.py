@@ -1,11 +1,11 @@
-import time
-import re
 import os
 import sys
 import platform
 import random
 import argparse
 import subprocess
+import threading
+import asyncio
 import psutil
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -14,12 +14,66 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import requests
+from selenium.common.exceptions import TimeoutException
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from serp_extraction import extract_search_results
+from text_processing import top_keywords
+from main_content import DEFAULT_BUDGET, extract_main_content
+from text_injection import INPUT_METHODS, insert_text, human_like_typing
+from chromedriver_check import check_chromedriver_compatibility
+from chrome_instances import (find_existing_chrome_debugging_port, is_chrome_running, probe, register,
+                              wait_for_debugging_port)
+from keyword_index import open_keyword_index
+from research_crawl import research
+from pipeline import DEFAULT_QUEUE_SIZE, print_metrics, run_pipeline
+from prompt_packing import DEFAULT_PROMPT_BUDGET, TRUNCATION_NOTE, pack_documents
+from llm_backends import ANALYZERS, DEFAULT_API_MODEL, build_analysis_prompt, create_analyzer
+from response_stream import STABLE_TIME, watch_for_response, stream_response
+from pacing import PACING_NAMES, Pacing, wait_for_document_ready, wait_for_network_idle, wait_for_new_tab
+from batch_search import read_queries, run_batch, load_pages
+from browser_daemon import connect_to_daemon
+from serp_cache import DEFAULT_TTL, open_cache
+from page_cache import DEFAULT_TTL as DEFAULT_PAGE_TTL, DEFAULT_MAX_BYTES, open_page_cache
+from http_fetch import FETCH_MODES, MIN_TEXT_CHARS, fetch_page_over_http, fetch_serp_over_http
 
 class AISearchAssistant:
-    def __init__(self, use_profile=False, use_default_profile=False, reuse_chrome=True, force_new_chrome=False):
+    def __init__(self, use_profile=False, use_default_profile=False, reuse_chrome=True, force_new_chrome=False,
+                 input_method="fast", cache=None, refresh_cache=False, fetch_mode="auto",
+                 min_http_text=MIN_TEXT_CHARS, pacing="human", content_budget=DEFAULT_BUDGET, page_cache=None,
+                 response_stable_time=STABLE_TIME, keyword_index=None):
+        # The one browser session is shared, so anything driving it holds this lock
+        # (HTTP fetches and cache hits don't, and can overlap with browser work)
+        self.browser_lock = threading.RLock()
+        
+        # How prompts are put into the chat input (see text_injection.INPUT_METHODS)
+        self.input_method = input_method
+        
+        # On-disk search result and page content caches (see serp_cache.SerpCache and
+        # page_cache.PageCache); refresh_cache skips reads but still stores
+        self.cache = cache
+        self.page_cache = page_cache
+        self.refresh_cache = refresh_cache
+        
+        # Whether pages are fetched over plain HTTP first (see http_fetch.FETCH_MODES), and how much
+        # visible text an HTTP response needs before it is trusted without rendering it in the browser
+        self.fetch_mode = fetch_mode
+        self.min_http_text = min_http_text
+        
+        # Artificial human-like delays (see pacing.PACING_PROFILES); page loads are always
+        # waited on through readiness checks, whatever the profile
+        self.pacing = Pacing(pacing)
+        
+        # Characters of main content kept per page (see main_content.extract_main_content)
+        self.content_budget = content_budget
+        
+        # Seconds a chat reply must stay unchanged to count as finished when the page shows no stop button
+        self.response_stable_time = response_stable_time
+        
+        # Document frequencies of everything read so far, for picking follow-up terms
+        # (see keyword_index.KeywordIndex); without one, plain word counts are used
+        self.keyword_index = keyword_index
+        
         # Ensure ChromeDriver is available and compatible
         self.check_and_setup_chromedriver()
         
@@ -75,7 +129,7 @@ class AISearchAssistant:
         # Check if we should try to reuse Chrome
         if reuse_chrome and not force_new_chrome:
             # First, try to connect to an existing Chrome instance with debugging enabled
-            port, options = attach_to_existing_chrome()
+            port, options = attach_to_existing_chrome(user_data_dir)
             if port:
                 print("Connecting to existing Chrome browser with remote debugging...")
                 self.debugging_port = port
@@ -96,7 +150,7 @@ class AISearchAssistant:
                     print("3. Use the --force-new-chrome option to use a temporary profile")
                     
                     # Add a brief pause to let the user read the message
-                    time.sleep(3)
+                    self.pacing.pause("notice")
                 else:
                     # No specific profile requested, just open a new browser window
                     print("Chrome is already running. Opening a new browser window.")
@@ -171,15 +225,11 @@ class AISearchAssistant:
                 current_tabs = self.driver.window_handles
                 # Open a new tab
                 self.driver.execute_script("window.open('about:blank', '_blank');")
-                # Wait for the new tab to open
-                time.sleep(1)
-                # Get updated tabs
-                new_tabs = self.driver.window_handles
-                # Find the new tab (the tab that's in new_tabs but not in current_tabs)
-                new_tab = list(set(new_tabs) - set(current_tabs))
-                if new_tab:
-                    # Switch to the new tab
-                    self.driver.switch_to.window(new_tab[0])
+                # Wait for the new tab (the one that isn't in current_tabs) and switch to it
+                try:
+                    self.driver.switch_to.window(wait_for_new_tab(self.driver, current_tabs))
+                except TimeoutException:
+                    pass
                 
                 print("Created a new tab in existing Chrome browser.")
         except Exception as e:
@@ -258,35 +308,30 @@ class AISearchAssistant:
                 raise
             return
         
-        # Test if ChromeDriver is compatible with installed Chrome
+        # Compare `chromedriver --version` with the installed Chrome instead of
+        # launching a browser; a pair that matched before is recognised from a stamp
+        compatible, chrome_version, driver_version = check_chromedriver_compatibility(chromedriver_path)
+        if compatible:
+            return
+        if compatible is None:
+            print(f"Couldn't compare ChromeDriver ({driver_version or 'unknown version'}) with Chrome "
+                  f"({chrome_version or 'unknown version'}). Continuing with the installed ChromeDriver.")
+            return
+        
+        print(f"ChromeDriver {driver_version} is not compatible with Chrome {chrome_version}.")
+        print("Downloading compatible ChromeDriver...")
         try:
-            print("Testing ChromeDriver compatibility...")
-            options = Options()
-            options.add_argument('--headless')
-            service = Service(executable_path=chromedriver_path)
-            driver = webdriver.Chrome(service=service, options=options)
-            driver.quit()
-            print("ChromeDriver is compatible with installed Chrome.")
-        except Exception as e:
-            error_message = str(e)
-            if "This version of ChromeDriver only supports Chrome version" in error_message:
-                print("ChromeDriver is not compatible with installed Chrome version.")
-                print("Downloading compatible ChromeDriver...")
-                try:
-                    subprocess.check_call([sys.executable, downloader_path])
-                except Exception as download_error:
-                    print(f"Error downloading ChromeDriver: {download_error}")
-                    raise
-            else:
-                print(f"Error testing ChromeDriver: {e}")
-                raise
+            subprocess.check_call([sys.executable, downloader_path])
+        except Exception as download_error:
+            print(f"Error downloading ChromeDriver: {download_error}")
+            raise
 
     def human_like_typing(self, element, text):
-        """Type text with random delays like a human would"""
-        for char in text:
-            element.send_keys(char)
-            # Random delay between keystrokes (50-150ms)
-            time.sleep(random.uniform(0.05, 0.15))
+        """Type text with random delays like a human would (all at once when pacing is fast)"""
+        if self.pacing.typing:
+            human_like_typing(element, text)
+        else:
+            element.send_keys(text)
     
     def human_like_scroll(self, scroll_amount=None):
         """Scroll the page in a human-like manner"""
@@ -297,22 +342,47 @@ class AISearchAssistant:
         # Use JavaScript to scroll
         self.driver.execute_script(f"window.scrollBy(0, {scroll_amount});")
         # Random pause after scrolling
-        time.sleep(random.uniform(0.5, 1.5))
+        self.pacing.pause("after_scroll")
     
     def search_google(self, query):
         """Search Google with the given query and extract results"""
         print(f"\nSearching Google for: {query}")
         
-        # Navigate to Google with a random delay
+        # Serve repeated queries from the cache instead of replaying the search
+        if self.cache and not self.refresh_cache:
+            cached_results = self.cache.get(query, max_results=5)
+            if cached_results is not None:
+                print("Using cached search results.")
+                return self._collect_results(cached_results)
+        
+        # A plain HTTP request is enough whenever Google serves the results without a script challenge
+        if self.fetch_mode != "browser":
+            http_results = fetch_serp_over_http(query, max_results=5)
+            if http_results:
+                print("Got search results over HTTP.")
+                if self.cache:
+                    self.cache.put(query, http_results, max_results=5)
+                return self._collect_results(http_results)
+            print("HTTP search didn't return results. Searching in the browser...")
+        
+        with self.browser_lock:
+            raw_results = self._search_in_browser(query)
+        if self.cache:
+            self.cache.put(query, raw_results, max_results=5)
+        
+        return self._collect_results(raw_results)
+    
+    def _search_in_browser(self, query):
+        """Type the query into Google in the browser and extract the raw results"""
+        # Navigate to Google and wait for the search box rather than a fixed delay
         self.driver.get("https://www.google.com")
-        time.sleep(random.uniform(1, 2))
         
         # Check for and handle cookies consent
         try:
             cookie_buttons = self.driver.find_elements(By.XPATH, "//button[contains(text(), 'Accept') or contains(text(), 'Agree') or contains(text(), 'I agree') or contains(text(), 'Accept all')]")
             if cookie_buttons:
                 cookie_buttons[0].click()
-                time.sleep(random.uniform(0.5, 1))
+                self.pacing.pause("after_click")
         except:
             pass
         
@@ -323,11 +393,8 @@ class AISearchAssistant:
             self.human_like_typing(search_box, query)
             
             # Random pause before hitting Enter
-            time.sleep(random.uniform(0.5, 1.2))
+            self.pacing.pause("before_submit")
             search_box.send_keys(Keys.RETURN)
-            
-            # Random pause after search
-            time.sleep(random.uniform(2, 3))
         except Exception as e:
             print(f"Error during search: {str(e)}")
             
@@ -340,39 +407,54 @@ class AISearchAssistant:
                 search_box = self.wait.until(EC.element_to_be_clickable((By.NAME, "q")))
                 search_box.clear()
                 self.human_like_typing(search_box, query)
-                time.sleep(random.uniform(0.5, 1.2))
+                self.pacing.pause("before_submit")
                 search_box.send_keys(Keys.RETURN)
         
         # Wait for results to load
         self.wait.until(EC.presence_of_element_located((By.ID, "search")))
         
-        # Human-like scrolling
-        self.human_like_scroll()
-        
-        # Random pause before extraction
-        time.sleep(random.uniform(1.5, 2.5))
+        # Human-like scrolling and a pause before extraction (skipped when pacing is fast)
+        if self.pacing.scrolling:
+            self.human_like_scroll()
+        self.pacing.pause("before_extract")
         
-        # Extract search results
-        search_results = self.driver.find_elements(By.CSS_SELECTOR, "div.g")
-        self.current_search_results = []
+        # Extract search results in a single script call
+        return extract_search_results(self.driver, max_results=5)  # Limit to top 5 results
+    
+    def _collect_results(self, raw_results):
+        """Keep the usable results as the current search results"""
+        results = []
         
-        for result in search_results[:5]:  # Limit to top 5 results
-            try:
-                title_element = result.find_element(By.CSS_SELECTOR, "h3")
-                title = title_element.text
-                link_element = result.find_element(By.CSS_SELECTOR, "a")
-                link = link_element.get_attribute("href")
-                
-                self.current_search_results.append({
-                    "title": title,
-                    "link": link
-                })
-                
-                print(f"Found: {title} - {link}")
-            except:
+        for result in raw_results:
+            # Skip results without a usable title or link
+            if not result["title"] or not result["link"]:
                 continue
+            
+            results.append({
+                "title": result["title"],
+                "link": result["link"],
+                "snippet": result["snippet"]
+            })
+            
+            print(f"Found: {result['title']} - {result['link']}")
         
-        return self.current_search_results
+        # Built locally so pipeline searches on other threads don't mix their lists
+        with self.browser_lock:
+            self.current_search_results = results
+        return results
+    
+    def search_many(self, queries, concurrency=4, max_results=5):
+        """Search several queries in parallel tabs, yielding (query, results, error) as each finishes"""
+        with self.browser_lock:
+            for query, raw_results, error in run_batch(self.driver, queries, concurrency=concurrency,
+                                                       max_results=max_results):
+                # Same filtering as search_google: skip results without a usable title or link
+                results = [
+                    {"title": result["title"], "link": result["link"], "snippet": result["snippet"]}
+                    for result in raw_results
+                    if result["title"] and result["link"]
+                ]
+                yield query, results, error
     
     def is_captcha_present(self):
         """Enhanced method to detect various types of CAPTCHAs"""
@@ -412,165 +494,257 @@ class AISearchAssistant:
         """Extract content from a web page"""
         print(f"\nGetting content from: {url}")
         
+        # Recently fetched pages are served straight from the cache
+        cached = self._cached_page(url)
+        if cached and cached["fresh"]:
+            print("Using cached page content.")
+            return self._build_content(url, cached)
+        
+        # Most articles are in the raw HTML, so try one HTTP request before navigating the browser;
+        # a stale cached copy is revalidated with a conditional GET whatever the fetch mode
+        if self.fetch_mode != "browser" or cached:
+            page, reason, from_cache = self._fetch_over_http(url, cached)
+            if from_cache:
+                print("Cached page content is still current.")
+                return self._build_content(url, page)
+            if self.fetch_mode != "browser":
+                if reason is None or self.fetch_mode == "http":
+                    # Only usable pages are cached; a failed fetch mustn't replace a good stale copy
+                    if reason is None:
+                        self._store_page(url, page)
+                    return self._build_content(url, page)
+                print(f"HTTP fetch not usable ({reason}). Loading the page in the browser...")
+        
+        with self.browser_lock:
+            page_html = self._load_in_browser(url)
+        
+        # Get the title and the main content within the character budget, with
+        # boilerplate dropped (uses the fastest installed parser backend)
+        page = extract_main_content(page_html, budget=self.content_budget)
+        self._store_page(url, page)
+        return self._build_content(url, page)
+    
+    def _load_in_browser(self, url):
+        """Navigate to a page, let it settle and return its HTML"""
         # Navigate to the page
         self.driver.get(url)
         
-        # Wait for the page to load with random time
-        time.sleep(random.uniform(3, 5))
+        # Wait for the page to finish loading and for late requests to settle
+        wait_for_document_ready(self.driver)
+        wait_for_network_idle(self.driver)
         
         # Human-like scrolling to simulate reading
-        for _ in range(random.randint(2, 4)):
-            self.human_like_scroll()
+        if self.pacing.scrolling:
+            for _ in range(random.randint(2, 4)):
+                self.human_like_scroll()
         
         # Get the page content
-        page_html = self.driver.page_source
-        soup = BeautifulSoup(page_html, 'html.parser')
-        
-        # Get the title
-        title = soup.title.string if soup.title else "No title found"
-        
-        # Try to extract main content (this is a simple approach and might need adjustment)
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "header"]):
-            script.extract()
-        
-        # Get text
-        text = soup.get_text(separator='\n')
+        return self.driver.page_source
+    
+    def _cached_page(self, url):
+        """Return the cached copy of a page (fresh, or stale but revalidatable), or None"""
+        if not self.page_cache or self.refresh_cache:
+            return None
+        return self.page_cache.get(url, budget=self.content_budget)
+    
+    def _fetch_over_http(self, url, cached=None):
+        """Fetch a page with one HTTP request, made conditional when there is a cached copy.
+        Returns (page, reason, from_cache); from_cache means the site answered 304 Not Modified."""
+        page, reason = fetch_page_over_http(
+            url,
+            min_text_chars=self.min_http_text,
+            budget=self.content_budget,
+            etag=cached["etag"] if cached else None,
+            last_modified=cached["last_modified"] if cached else None
+        )
+        if page.get("not_modified"):
+            self.page_cache.touch(url)
+            return cached, None, True
+        return page, reason, False
+    
+    def _store_page(self, url, page):
+        if self.page_cache:
+            self.page_cache.put(url, page, self.content_budget, page.get("etag"), page.get("last_modified"))
+    
+    def fetch_many(self, urls, concurrency=3):
+        """Fetch several pages in parallel, yielding (url, content, error) as each one completes"""
+        # Recently fetched pages come straight from the cache
+        cached_pages = {}
+        for url in urls:
+            cached = self._cached_page(url)
+            if cached and cached["fresh"]:
+                yield url, self._build_content(url, cached), None
+            else:
+                cached_pages[url] = cached
+        urls = list(cached_pages)
+        needs_browser = urls
         
-        # Clean up text
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = '\n'.join(chunk for chunk in chunks if chunk)
+        # Plain HTTP first, all at once (conditional for stale cached copies); only the
+        # pages that need rendering go on to the browser
+        http_urls = urls if self.fetch_mode != "browser" else [url for url in urls if cached_pages[url]]
+        if http_urls:
+            needs_browser = [url for url in urls if url not in http_urls]
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+                futures = {pool.submit(self._fetch_over_http, url, cached_pages[url]): url for url in http_urls}
+                for future in as_completed(futures):
+                    url = futures[future]
+                    page, reason, from_cache = future.result()
+                    if from_cache:
+                        yield url, self._build_content(url, page), None
+                    elif self.fetch_mode != "browser" and (reason is None or self.fetch_mode == "http"):
+                        if reason is None:
+                            self._store_page(url, page)
+                        yield url, self._build_content(url, page), None
+                    else:
+                        if self.fetch_mode != "browser":
+                            print(f"HTTP fetch of {url} not usable ({reason}). Loading it in the browser...")
+                        needs_browser.append(url)
         
-        # Trim the text to a reasonable length
-        max_length = 5000
-        if len(text) > max_length:
-            text = text[:max_length] + "... [Text truncated due to length]"
+        # The rest load side by side in separate tabs instead of one navigate-sleep-scroll cycle each
+        if not needs_browser:
+            return
+        with self.browser_lock:
+            for url, page_html, error in load_pages(self.driver, needs_browser, concurrency=concurrency):
+                if error:
+                    yield url, None, error
+                    continue
+                page = extract_main_content(page_html, budget=self.content_budget)
+                self._store_page(url, page)
+                yield url, self._build_content(url, page), None
+    
+    def _build_content(self, url, page):
+        """Package extracted main content with its URL and the budget it was cut to"""
+        text = page["text"]
+        if self.keyword_index:
+            self.keyword_index.add_document(text, key=url)
+        if page["truncated"]:
+            text += TRUNCATION_NOTE
         
         content = {
-            "title": title,
+            "title": page["title"] or "No title found",
             "text": text,
-            "url": url
+            "url": url,
+            "budget": self.content_budget,
+            "truncated": page["truncated"]
         }
         
         return content
     
-    def send_to_deepseek(self, content):
-        """Send the content to DeepSeek AI chat"""
-        print("\nSending data to DeepSeek...")
-        
-        # Navigate to DeepSeek chat
+    def _open_deepseek(self):
+        """Navigate to DeepSeek chat and wait for the app (and a manual login, if needed)"""
         self.driver.get("https://chat.deepseek.com/")
-        
-        # Wait for DeepSeek to load with random time
-        time.sleep(random.uniform(4, 6))
+        wait_for_document_ready(self.driver)
+        wait_for_network_idle(self.driver)
         
         # Check if login is required
         if "Sign in" in self.driver.page_source or "Log in" in self.driver.page_source:
             print("\nDeepSeek requires login. Please log in manually in the browser window.")
             print("If you're using a persistent profile (--profile), you should only need to do this once.")
             input("Press Enter after logging in to continue...")
-            time.sleep(2)  # Allow time for post-login page to load
+            wait_for_document_ready(self.driver)  # Allow the post-login page to load
+    
+    def _submit_to_deepseek(self, content):
+        """Type the analysis request into the open chat and send it"""
+        # Try multiple possible selectors for the input box
+        selectors = [
+            "textarea.resize-none",
+            "textarea[placeholder*='Send a message']",
+            "div[contenteditable='true']",
+            "div.chat-input textarea"
+        ]
+        
+        input_box = None
+        for selector in selectors:
+            try:
+                input_box = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, selector)))
+                if input_box:
+                    break
+            except:
+                continue
+        
+        if not input_box:
+            raise Exception("Could not find input area on DeepSeek interface")
+        
+        # Prepare the message
+        message = build_analysis_prompt(content)
+        
+        # Put the message into the input box (in one operation unless
+        # per-character typing was explicitly requested)
+        insert_text(self.driver, input_box, message, method=self.input_method)
+        
+        # Random pause before sending
+        self.pacing.pause("before_send")
+        
+        # Follow the reply from the moment the message goes out
+        watch_for_response(self.driver)
+        
+        # Try different methods to send the message
+        try:
+            # Method 1: Using keyboard shortcut
+            input_box.send_keys(Keys.CONTROL + Keys.ENTER)
+            
+            # The input clears once the message is sent; click a send button if it doesn't
+            try:
+                WebDriverWait(self.driver, 1).until(
+                    lambda d: not (input_box.get_attribute("value") or input_box.text)
+                )
+            except TimeoutException:
+                try:
+                    send_buttons = self.driver.find_elements(By.XPATH, 
+                        "//button[contains(@aria-label, 'send') or contains(@title, 'send') or contains(@class, 'send')]")
+                    if send_buttons:
+                        send_buttons[0].click()
+                except:
+                    pass
+        except:
+            # Method 2: Try to find and click a send button
+            try:
+                send_button = self.wait.until(EC.element_to_be_clickable((By.XPATH, 
+                    "//button[contains(@aria-label, 'send') or contains(@title, 'send') or contains(@class, 'send')]")))
+                send_button.click()
+            except:
+                # Method 3: Enter key
+                input_box.send_keys(Keys.ENTER)
+    
+    def stream_deepseek(self, content):
+        """Send the content to DeepSeek AI chat and yield the response text as it streams in"""
+        with self.browser_lock:
+            self._open_deepseek()
+            self._submit_to_deepseek(content)
+            yield from stream_response(self.driver, stable_time=self.response_stable_time)
+    
+    def send_to_deepseek(self, content):
+        """Send the content to DeepSeek AI chat"""
+        with self.browser_lock:
+            return self._send_to_deepseek(content)
+    
+    def _send_to_deepseek(self, content):
+        print("\nSending data to DeepSeek...")
+        self._open_deepseek()
         
         max_retries = 3
         retry_count = 0
         
         while retry_count < max_retries:
             try:
-                # Look for textarea to input the message
                 try:
-                    # Try multiple possible selectors for the input box
-                    selectors = [
-                        "textarea.resize-none",
-                        "textarea[placeholder*='Send a message']",
-                        "div[contenteditable='true']",
-                        "div.chat-input textarea"
-                    ]
-                    
-                    input_box = None
-                    for selector in selectors:
-                        try:
-                            input_box = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, selector)))
-                            if input_box:
-                                break
-                        except:
-                            continue
-                    
-                    if not input_box:
-                        raise Exception("Could not find input area on DeepSeek interface")
-                    
-                    # Prepare the message
-                    message = f"Analyze this content from {content['url']}:\n\nTitle: {content['title']}\n\nContent: {content['text']}\n\nProvide a comprehensive analysis and extract key information."
-                    
-                    # Type the message in chunks with human-like behavior
-                    chunk_size = 500
-                    for i in range(0, len(message), chunk_size):
-                        chunk = message[i:i+chunk_size]
-                        self.human_like_typing(input_box, chunk)
-                        time.sleep(random.uniform(0.3, 0.7))
-                    
-                    # Random pause before sending
-                    time.sleep(random.uniform(0.8, 1.5))
-                    
-                    # Try different methods to send the message
-                    try:
-                        # Method 1: Using keyboard shortcut
-                        input_box.send_keys(Keys.CONTROL + Keys.ENTER)
-                        
-                        # Check if a send button is present and try clicking it if shortcut didn't work
-                        time.sleep(1)
-                        try:
-                            send_buttons = self.driver.find_elements(By.XPATH, 
-                                "//button[contains(@aria-label, 'send') or contains(@title, 'send') or contains(@class, 'send')]")
-                            if send_buttons:
-                                send_buttons[0].click()
-                        except:
-                            pass
-                    except:
-                        # Method 2: Try to find and click a send button
-                        try:
-                            send_button = self.wait.until(EC.element_to_be_clickable((By.XPATH, 
-                                "//button[contains(@aria-label, 'send') or contains(@title, 'send') or contains(@class, 'send')]")))
-                            send_button.click()
-                        except:
-                            # Method 3: Enter key
-                            input_box.send_keys(Keys.ENTER)
-                    
-                    # Wait for response with progressive timeouts
+                    self._submit_to_deepseek(content)
                     print("Waiting for DeepSeek to respond...")
                     
-                    # Try to find different types of response elements
-                    response_selectors = [
-                        "div.markdown-body", 
-                        "div.message-content", 
-                        "div.assistant-message",
-                        "div.response-content"
-                    ]
-                    
-                    # Wait progressively longer for AI to generate a response
-                    wait_times = [5, 10, 15, 20]
-                    response_text = None
-                    
-                    for wait_time in wait_times:
-                        time.sleep(wait_time)
-                        
-                        # Check all possible response selectors
-                        for selector in response_selectors:
-                            try:
-                                response_elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                                if response_elements and len(response_elements) > 0:
-                                    # Get the last response element's text
-                                    response_text = response_elements[-1].text
-                                    if response_text and len(response_text) > 50:  # Ensure it's a substantial response
-                                        print("\nDeepSeek Response:")
-                                        print(response_text)
-                                        return response_text
-                            except:
-                                continue
+                    # Print the response as it streams in rather than after a fixed wait
+                    chunks = []
+                    for delta in stream_response(self.driver, stable_time=self.response_stable_time):
+                        if not chunks:
+                            print("\nDeepSeek Response:")
+                        print(delta, end="", flush=True)
+                        chunks.append(delta)
+                    if chunks:
+                        print()
                     
-                    # If we've checked all wait times and selectors but found nothing valid
-                    if not response_text or len(response_text) < 50:
+                    response_text = "".join(chunks)
+                    if len(response_text) < 50:  # Ensure it's a substantial response
                         raise Exception("No substantial response found from DeepSeek")
+                    return response_text
                 
                 except Exception as e:
                     print(f"Error with DeepSeek interface: {str(e)}")
@@ -579,7 +753,7 @@ class AISearchAssistant:
                         print(f"Retrying ({retry_count}/{max_retries})...")
                         # Refresh the page and try again
                         self.driver.refresh()
-                        time.sleep(5)  # Wait for page to refresh
+                        wait_for_document_ready(self.driver)  # Wait for page to refresh
                     else:
                         return f"Error interacting with DeepSeek: {str(e)}"
             
@@ -592,15 +766,13 @@ class AISearchAssistant:
     
     def follow_up_search(self, deepseek_response):
         """Generate a follow-up search query based on DeepSeek's response"""
-        # Simple approach: extract key terms from the response
-        words = re.findall(r'\b\w+\b', deepseek_response.lower())
-        common_words = ['the', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'and', 'or', 'but', 'is', 'are', 'was', 'were']
-        filtered_words = [word for word in words if word not in common_words and len(word) > 4]
-        
-        # Count word frequency
-        from collections import Counter
-        word_count = Counter(filtered_words)
-        top_words = [word for word, count in word_count.most_common(5)]
+        # The terms that set this response apart from everything read so far, or
+        # simply the most frequent ones without a keyword index
+        if self.keyword_index:
+            self.keyword_index.add_document(deepseek_response)
+            top_words = self.keyword_index.keywords(deepseek_response, count=5)
+        else:
+            top_words = top_keywords(deepseek_response, count=5)
         
         # Generate a new search query
         if top_words:
@@ -639,8 +811,111 @@ def parse_args():
                         help='Don\'t try to reuse running Chrome instances (starts a new session)')
     parser.add_argument('--force-new-chrome', action='store_true',
                         help='Force a new Chrome instance with a temporary profile (avoids profile conflicts)')
+    parser.add_argument('--input-method', choices=INPUT_METHODS, default='fast',
+                        help='How prompts are entered into DeepSeek: fast/cdp/js insert the whole message at once, '
+                             'keys sends it in chunks, human types it character by character (default: fast)')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Hand the work to a running browser_daemon.py instead of starting Chrome '
+                             '(address from BROWSER_DAEMON_ADDRESS, falls back to a local browser if none is running)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Don\'t read or write the on-disk search result cache')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Ignore cached search results but store the fresh ones')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL, metavar='SECONDS',
+                        help=f'How long cached search results stay valid (default: {DEFAULT_TTL})')
+    parser.add_argument('--page-cache-ttl', type=float, default=DEFAULT_PAGE_TTL, metavar='SECONDS',
+                        help='How long cached page content is used before it is revalidated with the site '
+                             f'(default: {DEFAULT_PAGE_TTL})')
+    parser.add_argument('--page-cache-mb', type=float, default=DEFAULT_MAX_BYTES / 1024 / 1024, metavar='MB',
+                        help=f'Disk space for cached page content (default: {DEFAULT_MAX_BYTES // 1024 // 1024})')
+    parser.add_argument('--no-keyword-index', action='store_true',
+                        help='Pick follow-up terms by plain word counts instead of weighting them against '
+                             'the pages and responses seen in earlier runs')
+    parser.add_argument('--fetch-mode', choices=FETCH_MODES, default='auto',
+                        help='auto tries a plain HTTP request before using the browser, http never uses the browser '
+                             'for fetching, browser always does (default: auto)')
+    parser.add_argument('--min-http-text', type=int, default=MIN_TEXT_CHARS, metavar='CHARS',
+                        help='In auto mode, load a page in the browser if HTTP returns less text than this '
+                             f'(default: {MIN_TEXT_CHARS})')
+    parser.add_argument('--sources', type=int, default=1, metavar='N',
+                        help='Fetch the top N results in parallel and analyze them together (default: 1)')
+    parser.add_argument('--prompt-budget', type=int, default=DEFAULT_PROMPT_BUDGET, metavar='CHARS',
+                        help='With --sources, characters of deduplicated source text packed into the one analysis prompt '
+                             f'(default: {DEFAULT_PROMPT_BUDGET})')
+    parser.add_argument('--pacing', choices=PACING_NAMES, default='human',
+                        help='human adds random pauses, per-character typing and scrolling; fast removes every '
+                             'artificial delay, for internal and intranet sites (default: human)')
+    parser.add_argument('--content-budget', type=int, default=DEFAULT_BUDGET, metavar='CHARS',
+                        help=f'Characters of main content kept per page (default: {DEFAULT_BUDGET})')
+    parser.add_argument('--response-stable-time', type=float, default=STABLE_TIME, metavar='SECONDS',
+                        help='Treat a DeepSeek reply as finished once it has not changed for this long and the page '
+                             f'shows no stop button (default: {STABLE_TIME})')
+    parser.add_argument('--analyzer', choices=ANALYZERS, default='browser',
+                        help='How content is analysed: browser drives the DeepSeek chat UI, api streams from an '
+                             'OpenAI-compatible endpoint with the key in LLM_API_KEY or DEEPSEEK_API_KEY (default: browser)')
+    parser.add_argument('--api-base-url', default=None, metavar='URL',
+                        help='Base URL of the chat completions API for --analyzer api '
+                             '(default: $LLM_API_BASE_URL or https://api.deepseek.com)')
+    parser.add_argument('--api-model', default=None, metavar='NAME',
+                        help=f'Model name for --analyzer api (default: $LLM_API_MODEL or {DEFAULT_API_MODEL})')
+    parser.add_argument('--batch', metavar='FILE', default=None,
+                        help='Search every query in FILE (one per line, "-" for stdin) in parallel tabs and print the results')
+    parser.add_argument('--concurrency', type=int, default=4, metavar='N',
+                        help='Number of tabs used in parallel in batch mode (default: 4)')
+    parser.add_argument('--pipeline', metavar='FILE', default=None,
+                        help='Search, fetch and analyze every query in FILE (one per line, "-" for stdin) with '
+                             'the three stages overlapping, then print per-stage metrics')
+    parser.add_argument('--search-workers', type=int, default=1, metavar='N',
+                        help='Queries searched at once in pipeline mode (default: 1)')
+    parser.add_argument('--fetch-workers', type=int, default=2, metavar='N',
+                        help='Queries whose pages are fetched at once in pipeline mode (default: 2)')
+    parser.add_argument('--analyze-workers', type=int, default=2, metavar='N',
+                        help='Analyses running at once in pipeline mode; the browser analyzer still takes '
+                             'turns on the one browser, so use --analyzer api to overlap them (default: 2)')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE, metavar='N',
+                        help=f'Items allowed to wait between two pipeline stages (default: {DEFAULT_QUEUE_SIZE})')
+    parser.add_argument('--research', metavar='QUERY', default=None,
+                        help='Research QUERY unattended: analyze the top results, follow each analysis\'s follow-up '
+                             'query, and repeat down to --depth levels')
+    parser.add_argument('--depth', type=int, default=2,
+                        help='Levels of follow-up queries in research mode (default: 2)')
+    parser.add_argument('--breadth', type=int, default=3,
+                        help='Results read per query in research mode (default: 3)')
+    parser.add_argument('--max-pages', type=int, default=50, metavar='N',
+                        help='Stop research mode after analysing N pages (default: 50)')
+    parser.add_argument('--time-budget', type=float, default=None, metavar='SECONDS',
+                        help='Stop research mode after this long (default: no limit)')
+    parser.add_argument('--research-output', metavar='FILE', default=None,
+                        help='Append every research finding to FILE as a JSON line as soon as it is done')
+    parser.add_argument('--metrics-interval', type=float, default=None, metavar='SECONDS',
+                        help='In pipeline mode, print queue depths this often while running')
     return parser.parse_args()
 
+def get_sources_content(assistant, search_results, sources=1, prompt_budget=DEFAULT_PROMPT_BUDGET):
+    """Fetch the top `sources` results (in parallel when there are several) as one content dict,
+    packed into prompt_budget characters so they can be analysed in a single round trip"""
+    if sources <= 1 or len(search_results) == 1:
+        return assistant.get_page_content(search_results[0]["link"])
+    
+    contents = []
+    for url, content, error in assistant.fetch_many([result["link"] for result in search_results[:sources]],
+                                                    concurrency=sources):
+        if error:
+            print(f"Couldn't get content from {url}: {error}")
+        else:
+            print(f"Got content from: {url}")
+            contents.append(content)
+    
+    if not contents:
+        raise Exception("Couldn't get content from any of the top results")
+    if len(contents) == 1:
+        return contents[0]
+    
+    packed = pack_documents(contents, budget=prompt_budget)
+    if packed["dropped"]:
+        print(f"Dropped {packed['dropped']} repeated or near-duplicate paragraphs across the sources")
+    return packed
+
 def main():
     # Parse command line arguments
     args = parse_args()
@@ -672,13 +947,72 @@ def main():
         print("This avoids conflicts with any running Chrome instances, but won't have your existing logins.")
     
     try:
-        # Initialize with profile if requested
-        assistant = AISearchAssistant(
-            use_profile=args.profile, 
-            use_default_profile=args.use_default_profile,
-            reuse_chrome=not args.no_reuse_chrome,
-            force_new_chrome=args.force_new_chrome
-        )
+        # A warm daemon skips the ChromeDriver check and browser startup entirely
+        assistant = connect_to_daemon() if args.daemon else None
+        if assistant:
+            print(f"\nUsing the browser daemon at {assistant.address}")
+        else:
+            if args.daemon:
+                print("\nNo browser daemon is running. Starting a browser for this run instead.")
+            # Initialize with profile if requested
+            assistant = AISearchAssistant(
+                use_profile=args.profile, 
+                use_default_profile=args.use_default_profile,
+                reuse_chrome=not args.no_reuse_chrome,
+                force_new_chrome=args.force_new_chrome,
+                input_method=args.input_method,
+                cache=open_cache(enabled=not args.no_cache, ttl=args.cache_ttl),
+                refresh_cache=args.refresh,
+                fetch_mode=args.fetch_mode,
+                min_http_text=args.min_http_text,
+                pacing=args.pacing,
+                content_budget=args.content_budget,
+                response_stable_time=args.response_stable_time,
+                keyword_index=open_keyword_index(enabled=not args.no_keyword_index),
+                page_cache=open_page_cache(enabled=not args.no_cache, ttl=args.page_cache_ttl,
+                                           max_bytes=int(args.page_cache_mb * 1024 * 1024))
+            )
+        
+        analyzer = create_analyzer(args.analyzer, assistant, base_url=args.api_base_url, model=args.api_model)
+        
+        # In batch mode, just search every query and report results as they arrive
+        if args.batch:
+            for query, results, error in assistant.search_many(read_queries(args.batch), concurrency=args.concurrency):
+                if error:
+                    print(f"\nQuery failed: {query} ({error})")
+                    continue
+                print(f"\nResults for: {query}")
+                for result in results:
+                    print(f"Found: {result['title']} - {result['link']}")
+            print("\nBatch search completed.")
+            return
+        
+        # In research mode, crawl outward from the query without asking anything
+        if args.research:
+            research(assistant, analyzer, args.research, depth=args.depth, breadth=args.breadth,
+                     max_pages=args.max_pages, time_budget=args.time_budget, output_path=args.research_output)
+            return
+        
+        # In pipeline mode, search, fetch and analyze every query with the stages overlapping
+        if args.pipeline:
+            def print_result(result):
+                print(f"\n=== {result['query']} ({result['url']}) ===\n{result['analysis']}")
+                if result["follow_up"]:
+                    print(f"Follow-up: {result['follow_up']}")
+            
+            _, metrics = asyncio.run(run_pipeline(
+                assistant, analyzer, read_queries(args.pipeline),
+                lambda results: get_sources_content(assistant, results, args.sources, args.prompt_budget),
+                search_workers=args.search_workers,
+                fetch_workers=args.fetch_workers,
+                analyze_workers=args.analyze_workers,
+                queue_size=args.queue_size,
+                on_result=print_result,
+                report_interval=args.metrics_interval
+            ))
+            print_metrics(metrics)
+            print("\nPipeline completed.")
+            return
         
         # Get the initial search query
         query = input("\nEnter your search query: ")
@@ -687,14 +1021,11 @@ def main():
         search_results = assistant.search_google(query)
         
         if search_results:
-            # Get the first result
-            first_result = search_results[0]
-            
-            # Get content from the page
-            content = assistant.get_page_content(first_result["link"])
+            # Get content from the top result(s)
+            content = get_sources_content(assistant, search_results, args.sources, args.prompt_budget)
             
-            # Send to DeepSeek
-            deepseek_response = assistant.send_to_deepseek(content)
+            # Analyse it (in the DeepSeek chat UI, or over the API with --analyzer api)
+            deepseek_response = analyzer.analyze(content)
             
             # Generate follow-up search
             follow_up_query = assistant.follow_up_search(deepseek_response)
@@ -708,11 +1039,11 @@ def main():
                     follow_up_results = assistant.search_google(follow_up_query)
                     
                     if follow_up_results:
-                        # Get content from the first follow-up result
-                        follow_up_content = assistant.get_page_content(follow_up_results[0]["link"])
+                        # Get content from the top follow-up result(s)
+                        follow_up_content = get_sources_content(assistant, follow_up_results, args.sources, args.prompt_budget)
                         
-                        # Send to DeepSeek
-                        assistant.send_to_deepseek(follow_up_content)
+                        # Analyse it
+                        analyzer.analyze(follow_up_content)
         
         print("\nSearch assistant process completed.")
     except Exception as e:
@@ -739,7 +1070,10 @@ def main():
         # Define assistant variable in case it wasn't defined due to an early error
         assistant_exists = 'assistant' in locals() or 'assistant' in globals()
         
-        if assistant_exists:
+        if assistant_exists and (args.batch or args.research or args.pipeline):
+            # Unattended runs shouldn't end on a question
+            assistant.close()
+        elif assistant_exists:
             # Ask if the user wants to keep the browser open
             keep_open = input("\nDo you want to keep the browser open? (yes/no): ")
             if keep_open.lower() != 'yes':
@@ -751,20 +1085,6 @@ def main():
         else:
             print("\nScript terminated due to initialization error.")
 
-def find_existing_chrome_debugging_port():
-    """Check if Chrome is already running with remote debugging enabled and get the port"""
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-        try:
-            cmdline = proc.info.get('cmdline', [])
-            if cmdline and any('chrome' in cmd.lower() for cmd in cmdline):
-                for cmd in cmdline:
-                    if '--remote-debugging-port=' in cmd:
-                        port = cmd.split('=')[1]
-                        return int(port)
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess, ValueError):
-            pass
-    return None
-
 def is_chrome_running_with_debugging():
     """Check if Chrome is already running with remote debugging enabled"""
     return find_existing_chrome_debugging_port() is not None
@@ -774,18 +1094,11 @@ def get_running_chrome_info():
     port = find_existing_chrome_debugging_port()
     if not port:
         return None
-    
-    try:
-        response = requests.get(f'http://localhost:{port}/json/version')
-        if response.status_code == 200:
-            return response.json()
-        return None
-    except:
-        return None
+    return probe(port)
 
-def attach_to_existing_chrome():
-    """Try to attach to an already running Chrome instance"""
-    port = find_existing_chrome_debugging_port()
+def attach_to_existing_chrome(user_data_dir=None):
+    """Try to attach to an already running Chrome instance, preferring one using user_data_dir"""
+    port = find_existing_chrome_debugging_port(user_data_dir)
     if port:
         print(f"Found Chrome running with debugging port: {port}")
         chrome_options = Options()
@@ -793,17 +1106,6 @@ def attach_to_existing_chrome():
         return port, chrome_options
     return None, None
 
-def is_chrome_running():
-    """Check if Chrome is running on the system"""
-    for proc in psutil.process_iter(['pid', 'name']):
-        try:
-            process_name = proc.info['name'].lower()
-            if 'chrome' in process_name and 'chromedriver' not in process_name:
-                return True
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            pass
-    return False
-
 def start_chrome_with_debugging(user_data_dir=None):
     """Start Chrome with remote debugging enabled"""
     chrome_path = None
@@ -843,14 +1145,12 @@ def start_chrome_with_debugging(user_data_dir=None):
         command.append(f"--user-data-dir={user_data_dir}")
     
     # Start Chrome in background
-    if system == "Windows":
-        from subprocess import DEVNULL
-        subprocess.Popen(command, stdout=DEVNULL, stderr=DEVNULL, shell=True)
-    else:
-        subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # No shell, so the pid recorded below is Chrome's own on every platform
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     
-    # Give Chrome a moment to start
-    time.sleep(3)
+    # Wait until Chrome answers on the port, and remember it so the next run finds it without a process scan
+    if wait_for_debugging_port(debugging_port):
+        register(debugging_port, process.pid, user_data_dir)
     
     return debugging_port
 
@@ -0,0 +1,170 @@
+import sys
+import time
+import itertools
+import urllib.parse
+from serp_extraction import extract_search_results
+
+# Marks the current document as stale and starts the next navigation; the
+# assignment returns immediately, so every tab loads in parallel
+NAVIGATE_SCRIPT = """
+window.__batchStale = true;
+window.location.href = arguments[0];
+"""
+
+# Runs inside a tab and reports how far its results page has got, without
+# blocking on the load the way driver.get() does
+PAGE_STATE_SCRIPT = """
+return [!!window.__batchStale, document.readyState, !!document.getElementById('search'), location.pathname];
+"""
+
+def read_queries(path):
+    """Yield one query per line from a file or stdin ("-"), skipping blank lines and # comments"""
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        for line in stream:
+            query = line.strip()
+            if query and not query.startswith("#"):
+                yield query
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def google_search_url(query):
+    """Build the Google results URL for a query"""
+    return f"https://www.google.com/search?q={urllib.parse.quote(query)}"
+
+def run_in_tabs(driver, items, url_for, collect, on_timeout, concurrency=4, timeout=20, poll_interval=0.1,
+                on_error=None):
+    """Load url_for(item) for every item across up to `concurrency` tabs of one browser.
+
+    collect(item, ready_state, has_results, path) is called while the tab is on
+    the item's page and returns the item's outcome, or None if it isn't ready yet;
+    on_timeout(item) gives the outcome of a page that didn't get there in time,
+    including one whose tab kept failing to answer, and on_error(item, message)
+    that of one whose tab was closed (on_timeout when not given). Outcomes are
+    yielded as soon as each tab finishes."""
+    # Imported here so modules that only want read_queries or google_search_url
+    # (the cache and plain-HTTP paths) don't pull in the browser stack
+    from selenium.common.exceptions import NoSuchWindowException, WebDriverException
+
+    items = iter(items)
+    end = object()
+    home_tab = driver.current_window_handle
+    idle_tabs = [home_tab]
+    active = {}  # tab handle -> (item, time the navigation started)
+
+    def start(tab, item):
+        driver.switch_to.window(tab)
+        driver.execute_script(NAVIGATE_SCRIPT, url_for(item))
+        active[tab] = (item, time.monotonic())
+
+    try:
+        # Fill the first `concurrency` tabs, reusing the caller's tab for the first item
+        for item in itertools.islice(items, max(1, concurrency)):
+            if not idle_tabs:
+                driver.switch_to.new_window('tab')
+                idle_tabs.append(driver.current_window_handle)
+            start(idle_tabs.pop(), item)
+
+        while active:
+            finished_any = False
+            for tab in list(active):
+                item, started = active[tab]
+                timed_out = time.monotonic() - started > timeout
+                try:
+                    driver.switch_to.window(tab)
+                    stale, ready_state, has_results, path = driver.execute_script(PAGE_STATE_SCRIPT)
+                except NoSuchWindowException:
+                    # The tab is gone; give up on its item and carry on in a new tab
+                    del active[tab]
+                    finished_any = True
+                    yield on_error(item, "the tab was closed") if on_error else on_timeout(item)
+                    next_item = next(items, end)
+                    if next_item is end:
+                        continue
+                    # new_window() fails too while the driver is focused on the closed tab
+                    open_tabs = driver.window_handles
+                    if not open_tabs:
+                        # The whole browser window is gone; nothing else can load
+                        for item in itertools.chain([next_item], items):
+                            yield on_error(item, "the browser has no open tabs") if on_error else on_timeout(item)
+                        continue
+                    driver.switch_to.window(open_tabs[0])
+                    driver.switch_to.new_window('tab')
+                    start(driver.current_window_handle, next_item)
+                    continue
+                except WebDriverException:
+                    # Mid-navigation ("execution context was destroyed") and the like; ask again
+                    stale, ready_state, has_results, path = True, None, False, ""
+
+                if stale and not timed_out:
+                    # Still showing the previous page; the new one hasn't committed yet
+                    continue
+                outcome = None if stale else collect(item, ready_state, has_results, path)
+                if outcome is None:
+                    if not timed_out:
+                        continue
+                    outcome = on_timeout(item)
+
+                del active[tab]
+                finished_any = True
+                yield outcome
+
+                # Hand the tab straight to the next item
+                next_item = next(items, end)
+                if next_item is not end:
+                    start(tab, next_item)
+                else:
+                    idle_tabs.append(tab)
+
+            if not finished_any:
+                time.sleep(poll_interval)
+    finally:
+        # Close the extra tabs and leave the driver where the caller had it
+        for tab in set(idle_tabs) | set(active):
+            if tab != home_tab:
+                try:
+                    driver.switch_to.window(tab)
+                    driver.close()
+                except Exception:
+                    pass
+        try:
+            driver.switch_to.window(home_tab)
+        except NoSuchWindowException:
+            # The caller's tab was closed along the way; leave the driver on one that is still open
+            if driver.window_handles:
+                driver.switch_to.window(driver.window_handles[0])
+
+def run_batch(driver, queries, concurrency=4, max_results=None, timeout=20, poll_interval=0.1):
+    """Run queries across up to `concurrency` tabs of one browser and yield
+    (query, results, error) for each query as soon as its tab has finished"""
+    def collect(query, ready_state, has_results, path):
+        if has_results:
+            try:
+                return query, extract_search_results(driver, max_results=max_results), None
+            except Exception as e:
+                return query, [], f"extraction failed: {e}"
+        if ready_state == "complete" and path.startswith("/sorry"):
+            return query, [], "Google returned a CAPTCHA page"
+        return None
+
+    return run_in_tabs(driver, queries, google_search_url, collect,
+                       lambda query: (query, [], f"no results after {timeout}s"),
+                       concurrency=concurrency, timeout=timeout, poll_interval=poll_interval,
+                       on_error=lambda query, message: (query, [], message))
+
+def load_pages(driver, urls, concurrency=4, timeout=20, poll_interval=0.1):
+    """Load urls across up to `concurrency` tabs of one browser and yield
+    (url, page_html, error) for each page as soon as it has finished loading"""
+    def collect(url, ready_state, has_results, path):
+        if ready_state != "complete":
+            return None
+        try:
+            return url, driver.page_source, None
+        except Exception as e:
+            return url, None, f"couldn't read the page: {e}"
+
+    return run_in_tabs(driver, urls, lambda url: url, collect,
+                       lambda url: (url, None, f"page didn't finish loading in {timeout}s"),
+                       concurrency=concurrency, timeout=timeout, poll_interval=poll_interval,
+                       on_error=lambda url, message: (url, None, message))
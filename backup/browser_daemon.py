@@ -0,0 +1,276 @@
+import os
+import sys
+import json
+import queue
+import socket
+import argparse
+import tempfile
+import threading
+import contextlib
+import socketserver
+from pacing import PACING_NAMES
+
+# Where the daemon listens unless --address or BROWSER_DAEMON_ADDRESS says otherwise.
+# An address containing a colon is host:port (TCP), anything else is a Unix socket path.
+if hasattr(socket, "AF_UNIX"):
+    DEFAULT_ADDRESS = os.path.join(tempfile.gettempdir(), f"browser-daemon-{os.getuid()}.sock")
+else:
+    # Windows Pythons without AF_UNIX fall back to a loopback TCP port
+    DEFAULT_ADDRESS = "127.0.0.1:9333"
+
+class DaemonError(Exception):
+    """The daemon could not be reached or reported an error for a request"""
+
+def get_daemon_address(address=None):
+    return address or os.environ.get("BROWSER_DAEMON_ADDRESS") or DEFAULT_ADDRESS
+
+def _split_tcp_address(address):
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+class DaemonClient:
+    """Talks to a running browser daemon; exposes the same methods main() uses on AISearchAssistant"""
+
+    def __init__(self, address=None, timeout=600):
+        self.address = get_daemon_address(address)
+        self.timeout = timeout
+
+    def _connect(self):
+        if ":" in self.address:
+            sock = socket.create_connection(_split_tcp_address(self.address), timeout=self.timeout)
+        else:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.address)
+        return sock
+
+    def stream(self, action, **params):
+        """Send one request and yield every item the daemon streams back"""
+        try:
+            sock = self._connect()
+        except OSError as e:
+            raise DaemonError(f"Browser daemon is not running at {self.address} ({e})") from e
+        with sock, sock.makefile("rwb") as channel:
+            channel.write(json.dumps({"action": action, **params}).encode("utf-8") + b"\n")
+            channel.flush()
+            for line in channel:
+                message = json.loads(line)
+                if "item" in message:
+                    yield message["item"]
+                elif message.get("ok"):
+                    if "result" in message:
+                        yield message["result"]
+                    return
+                else:
+                    raise DaemonError(message.get("error", "Unknown daemon error"))
+        raise DaemonError("Browser daemon closed the connection without finishing the request")
+
+    def call(self, action, **params):
+        """Send one request and return its single result"""
+        items = self.stream(action, **params)
+        try:
+            return next(items, None)
+        finally:
+            items.close()
+
+    def is_running(self):
+        try:
+            return self.call("ping") == "pong"
+        except DaemonError:
+            return False
+
+    def search_google(self, query, max_results=5):
+        return self.call("search", query=query, max_results=max_results)
+
+    def search_many(self, queries, concurrency=4, max_results=5):
+        for item in self.stream("batch", queries=list(queries), concurrency=concurrency, max_results=max_results):
+            yield item["query"], item["results"], item["error"]
+
+    def get_page_content(self, url):
+        return self.call("fetch", url=url)
+
+    def fetch_many(self, urls, concurrency=3):
+        for item in self.stream("fetch_many", urls=list(urls), concurrency=concurrency):
+            yield item["url"], item["content"], item["error"]
+
+    def send_to_deepseek(self, content):
+        return self.call("analyze", content=content)
+
+    def stream_deepseek(self, content):
+        yield from self.stream("analyze_stream", content=content)
+
+    def follow_up_search(self, deepseek_response):
+        return self.call("follow_up", text=deepseek_response)
+
+    def shutdown(self):
+        self.call("shutdown")
+
+    def close(self):
+        """Nothing to release locally; the daemon keeps its browsers warm for the next caller"""
+
+def connect_to_daemon(address=None):
+    """Return a client for a running daemon, or None if none is listening"""
+    client = DaemonClient(address)
+    return client if client.is_running() else None
+
+class SessionPool:
+    """Warm AISearchAssistant sessions handed out to one request at a time"""
+
+    def __init__(self, sessions):
+        self.sessions = sessions
+        self._idle = queue.Queue()
+        for session in sessions:
+            self._idle.put(session)
+
+    @contextlib.contextmanager
+    def session(self):
+        session = self._idle.get()
+        try:
+            yield session
+        finally:
+            self._idle.put(session)
+
+    def close(self):
+        for session in self.sessions:
+            try:
+                session.close()
+            except Exception as e:
+                print(f"Error closing browser session: {e}")
+
+def _run_action(session, request, send):
+    action = request.get("action")
+    if action == "search":
+        for _, results, error in session.search_many([request["query"]], concurrency=1,
+                                                    max_results=request.get("max_results", 5)):
+            if error:
+                raise DaemonError(error)
+            return results
+        return []
+    if action == "batch":
+        for query, results, error in session.search_many(request["queries"], concurrency=request.get("concurrency", 4),
+                                                        max_results=request.get("max_results", 5)):
+            send({"item": {"query": query, "results": results, "error": error}})
+        return None
+    if action == "fetch":
+        return session.get_page_content(request["url"])
+    if action == "fetch_many":
+        for url, content, error in session.fetch_many(request["urls"], concurrency=request.get("concurrency", 3)):
+            send({"item": {"url": url, "content": content, "error": error}})
+        return None
+    if action == "analyze":
+        return session.send_to_deepseek(request["content"])
+    if action == "analyze_stream":
+        for delta in session.stream_deepseek(request["content"]):
+            send({"item": delta})
+        return None
+    if action == "follow_up":
+        return session.follow_up_search(request["text"])
+    raise DaemonError(f"Unknown action: {action}")
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        def send(message):
+            self.wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+        try:
+            request = json.loads(self.rfile.readline())
+            action = request.get("action")
+            if action == "ping":
+                send({"ok": True, "result": "pong"})
+            elif action == "shutdown":
+                send({"ok": True})
+                # shutdown() blocks until serve_forever returns, so it can't run on this thread
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            else:
+                with self.server.pool.session() as session:
+                    result = _run_action(session, request, send)
+                send({"ok": True, "result": result} if result is not None else {"ok": True})
+        except Exception as e:
+            try:
+                send({"ok": False, "error": str(e)})
+            except OSError:
+                pass
+
+def _make_server(address):
+    if ":" in address:
+        class Server(socketserver.ThreadingTCPServer):
+            allow_reuse_address = True
+            daemon_threads = True
+        return Server(_split_tcp_address(address), DaemonRequestHandler)
+
+    class Server(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+    if os.path.exists(address):
+        # A socket left behind by a daemon that didn't exit cleanly
+        if connect_to_daemon(address):
+            raise DaemonError(f"A browser daemon is already running at {address}")
+        os.remove(address)
+    return Server(address, DaemonRequestHandler)
+
+def serve(address=None, sessions=1, **assistant_options):
+    """Start the warm browser sessions and handle requests until asked to shut down"""
+    from ai_search_assistant import AISearchAssistant
+
+    address = get_daemon_address(address)
+    server = _make_server(address)
+    if ":" not in address:
+        os.chmod(address, 0o600)
+
+    print(f"Starting {sessions} warm browser session(s)...")
+    pool = SessionPool([AISearchAssistant(**assistant_options) for _ in range(sessions)])
+    server.pool = pool
+
+    print(f"Browser daemon listening on {address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if ":" not in address and os.path.exists(address):
+            os.remove(address)
+        pool.close()
+        print("Browser daemon stopped.")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Warm browser daemon for the search scripts')
+    parser.add_argument('--address', default=None,
+                        help=f'Unix socket path or host:port to listen on (default: {DEFAULT_ADDRESS})')
+    parser.add_argument('--sessions', type=int, default=1, metavar='N',
+                        help='Number of warm browser sessions to keep (default: 1)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Use a persistent Chrome profile (helps with CAPTCHAs)')
+    parser.add_argument('--force-new-chrome', action='store_true',
+                        help='Use a new Chrome instance with a temporary profile')
+    parser.add_argument('--pacing', choices=PACING_NAMES, default='human',
+                        help='Pacing profile of the warm sessions (default: human)')
+    parser.add_argument('--status', action='store_true', help='Report whether a daemon is running and exit')
+    parser.add_argument('--stop', action='store_true', help='Stop a running daemon and exit')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    if args.status or args.stop:
+        client = connect_to_daemon(args.address)
+        if not client:
+            print(f"No browser daemon running at {get_daemon_address(args.address)}")
+            sys.exit(1)
+        if args.stop:
+            client.shutdown()
+            print("Browser daemon is shutting down.")
+        else:
+            print(f"Browser daemon is running at {client.address}")
+        return
+
+    serve(
+        args.address,
+        sessions=args.sessions,
+        use_profile=args.profile,
+        force_new_chrome=args.force_new_chrome,
+        pacing=args.pacing
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import os
+import json
+import hashlib
+import urllib.parse
+import requests
+
+# Chrome for Testing metadata. The per-milestone file is a small fraction of the
+# size of the full history and already names the newest build of each
+# milestone; the full list is only needed when a milestone is missing from it.
+LATEST_PER_MILESTONE_URL = ("https://googlechromelabs.github.io/chrome-for-testing/"
+                            "latest-versions-per-milestone-with-downloads.json")
+KNOWN_GOOD_VERSIONS_URL = ("https://googlechromelabs.github.io/chrome-for-testing/"
+                           "known-good-versions-with-downloads.json")
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'browser-automation', 'chrome-for-testing')
+
+# Metadata already loaded by this process, by location, as (data, validator), so
+# repeated lookups don't revalidate again
+_loaded = {}
+
+# Milestone indexes built from loaded metadata, by (location, validator), so repeated
+# lookups don't rescan the file (the full history lists every version ever published)
+_indexes = {}
+
+def get_mirror(mirror=None):
+    """The mirror to provision from: the argument, else CHROMEDRIVER_MIRROR; "" means upstream.
+
+    A mirror is a base URL or a local directory laid out like the output of
+    chromedriver_mirror.py: the metadata JSON files at the top and the zips
+    under <version>/<platform>/."""
+    if mirror is None:
+        mirror = os.environ.get("CHROMEDRIVER_MIRROR")
+    return mirror.rstrip("/\\") if mirror else None
+
+def is_local(location):
+    return not location.startswith(("http://", "https://"))
+
+def local_path(location):
+    return location[len("file://"):] if location.startswith("file://") else location
+
+def mirror_location(mirror, relative_path):
+    """Where a file with the given /-separated relative path lives in a mirror"""
+    if is_local(mirror):
+        return os.path.join(local_path(mirror), *relative_path.split("/"))
+    return f"{mirror}/{relative_path}"
+
+def mirror_relative_path(download_url):
+    """<version>/<platform>/<file>, the tail of a Chrome for Testing download URL"""
+    return "/".join(urllib.parse.urlsplit(download_url).path.rstrip("/").split("/")[-3:])
+
+def parse_version(version):
+    """Turn "136.0.7103.93" into (136, 0, 7103, 93) so versions compare numerically"""
+    return tuple(int(part) if part.isdigit() else 0 for part in version.split("."))
+
+def _replace_file(path, data):
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as output_file:
+        output_file.write(data)
+    os.replace(temporary, path)
+
+def fetch_metadata(url, cache_dir=None, timeout=30, mirror=None):
+    """Return the JSON at url, kept in a local cache and revalidated with ETag/If-Modified-Since.
+
+    An unchanged file costs one 304 response, and the cached copy is used if the
+    request fails altogether. With a mirror (see get_mirror) the file of the same
+    name is taken from there instead, straight from disk for a local directory."""
+    return _load(url, cache_dir, timeout, mirror)[1]
+
+def _load(url, cache_dir=None, timeout=30, mirror=None):
+    """fetch_metadata(), returning (location, data, validator) where validator identifies the version loaded"""
+    cache_dir = cache_dir or os.environ.get("CFT_CACHE_DIR") or DEFAULT_CACHE_DIR
+    name = url.rsplit("/", 1)[-1]
+    mirror = get_mirror(mirror)
+    if mirror:
+        url = mirror_location(mirror, name)
+    if url in _loaded:
+        return (url,) + _loaded[url]
+    if mirror and is_local(mirror):
+        with open(url, encoding="utf-8") as metadata_file:
+            stat = os.fstat(metadata_file.fileno())
+            _loaded[url] = (json.load(metadata_file), (stat.st_mtime_ns, stat.st_size))
+        return (url,) + _loaded[url]
+    if mirror:
+        # Kept apart from the upstream copy, which may differ
+        cache_dir = os.path.join(cache_dir, "mirror-" + hashlib.sha1(mirror.encode("utf-8")).hexdigest()[:10])
+    body_path = os.path.join(cache_dir, name)
+    meta_path = body_path + ".meta"
+
+    meta = {}
+    if os.path.exists(body_path):
+        try:
+            with open(meta_path, encoding="utf-8") as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            meta = {}
+
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        response = requests.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304:
+            print(f"Cached {name} is up to date.")
+        else:
+            response.raise_for_status()
+            os.makedirs(cache_dir, exist_ok=True)
+            # Both files are written to a temporary name and renamed, so a crash never
+            # leaves half of either. The body goes first: a crash in between pairs it
+            # with the old validators, which only costs one full download next time
+            _replace_file(body_path, response.content)
+            _replace_file(meta_path, json.dumps({"etag": response.headers.get("ETag"),
+                                                 "last_modified": response.headers.get("Last-Modified")}).encode("utf-8"))
+    except requests.RequestException as e:
+        if not os.path.exists(body_path):
+            raise
+        print(f"Couldn't refresh {name} ({e}). Using the cached copy.")
+
+    try:
+        with open(meta_path, encoding="utf-8") as meta_file:
+            meta = json.load(meta_file)
+    except (OSError, ValueError):
+        meta = {}
+    with open(body_path, encoding="utf-8") as body_file:
+        stat = os.fstat(body_file.fileno())
+        validator = (meta.get("etag"), meta.get("last_modified"), stat.st_mtime_ns, stat.st_size)
+        _loaded[url] = (json.load(body_file), validator)
+    return (url,) + _loaded[url]
+
+def _index_versions(entries):
+    """Index version entries as {milestone: {platform: (version, url)}}, keeping the newest build"""
+    index = {}
+    for entry in entries:
+        version = entry.get("version", "")
+        milestone = version.split(".")[0]
+        for download in entry.get("downloads", {}).get("chromedriver", []):
+            platforms = index.setdefault(milestone, {})
+            current = platforms.get(download.get("platform"))
+            if current is None or parse_version(version) > parse_version(current[0]):
+                platforms[download.get("platform")] = (version, download.get("url"))
+    return index
+
+def _milestone_index(url, cache_dir, mirror, entries):
+    """The _index_versions() index of the metadata at url, built once per version of the file"""
+    location, data, validator = _load(url, cache_dir, mirror=mirror)
+    key = (location, validator)
+    if key not in _indexes:
+        _indexes[key] = _index_versions(entries(data))
+    return _indexes[key]
+
+def find_chromedriver_download(major_version, platform_name, cache_dir=None, mirror=None):
+    """Return (version, url) of the newest ChromeDriver for a Chrome milestone and
+    platform, or None if Chrome for Testing has no build for it. With a mirror,
+    url points into the mirror (a path for a local directory)."""
+    major_version = str(major_version)
+    mirror = get_mirror(mirror)
+    index = _milestone_index(LATEST_PER_MILESTONE_URL, cache_dir, mirror or "",
+                             lambda data: data.get("milestones", {}).values())
+    match = index.get(major_version, {}).get(platform_name)
+    if not match:
+        # Not in the per-milestone file; fall back to the full history
+        try:
+            index = _milestone_index(KNOWN_GOOD_VERSIONS_URL, cache_dir, mirror or "",
+                                     lambda data: data.get("versions", []))
+        except OSError:
+            if not mirror:
+                raise
+            return None  # Mirrors may leave the full history out
+        match = index.get(major_version, {}).get(platform_name)
+    if match and mirror:
+        version, url = match
+        return version, mirror_location(mirror, mirror_relative_path(url))
+    return match
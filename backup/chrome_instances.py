@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import psutil
+import requests
+
+# Chrome instances started with remote debugging by these scripts, so the next
+# run can find them by probing a port or two instead of scanning every process
+DEFAULT_REGISTRY_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'browser-automation', 'chrome_instances.json')
+
+PROBE_TIMEOUT = 0.5
+
+# A process scan is reused for this many seconds, so checks made back to back share one pass
+SCAN_MAX_AGE = 2.0
+
+_last_scan = None  # (time, instances, chrome_running)
+
+def get_registry_path():
+    return os.environ.get("CHROME_INSTANCE_REGISTRY") or DEFAULT_REGISTRY_PATH
+
+def probe(port, timeout=PROBE_TIMEOUT):
+    """Return the /json/version info of the debugging endpoint on port, or None if nothing answers"""
+    try:
+        response = requests.get(f"http://127.0.0.1:{port}/json/version", timeout=timeout)
+        if response.status_code == 200:
+            return response.json()
+    except (requests.RequestException, ValueError):
+        pass
+    return None
+
+def _read_registry(path):
+    try:
+        with open(path, encoding="utf-8") as registry_file:
+            return json.load(registry_file)
+    except (OSError, ValueError):
+        return []
+
+def _write_registry(path, instances):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as registry_file:
+            json.dump(instances, registry_file)
+        os.replace(temporary, path)
+    except OSError:
+        pass  # Only means a process scan next time
+
+def register(port, pid=None, user_data_dir=None, path=None):
+    """Remember a Chrome instance started with --remote-debugging-port=port"""
+    path = path or get_registry_path()
+    instances = [instance for instance in _read_registry(path) if instance.get("port") != port]
+    instances.append({"port": port, "pid": pid, "user_data_dir": user_data_dir})
+    _write_registry(path, instances)
+
+def unregister(port, path=None):
+    path = path or get_registry_path()
+    instances = _read_registry(path)
+    remaining = [instance for instance in instances if instance.get("port") != port]
+    if len(remaining) != len(instances):
+        _write_registry(path, remaining)
+
+def _option_value(cmdline, option):
+    for arg in cmdline:
+        if arg.startswith(option + "="):
+            return arg.split("=", 1)[1]
+    return None
+
+def scan_chrome_processes(max_age=SCAN_MAX_AGE):
+    """One pass over every process: return (debugging instances, whether any Chrome is running).
+
+    Instances are dicts with port, pid and user_data_dir, one per port (the
+    browser process, not its renderers and helpers). A scan younger than
+    max_age seconds is returned again instead of walking the process table twice."""
+    global _last_scan
+    if _last_scan and time.time() - _last_scan[0] < max_age:
+        return _last_scan[1], _last_scan[2]
+
+    instances = {}
+    chrome_running = False
+    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+        try:
+            name = (proc.info.get('name') or '').lower()
+            if 'chrome' in name and 'chromedriver' not in name:
+                chrome_running = True
+            cmdline = proc.info.get('cmdline') or []
+            if not any('chrome' in arg.lower() for arg in cmdline):
+                continue
+            port = _option_value(cmdline, '--remote-debugging-port')
+            if not port:
+                continue
+            port = int(port)
+            # Child processes carry --type=...; keep the browser process when both are seen
+            if port in instances and _option_value(cmdline, '--type'):
+                continue
+            instances[port] = {
+                "port": port,
+                "pid": proc.info['pid'],
+                "user_data_dir": _option_value(cmdline, '--user-data-dir'),
+            }
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess, ValueError):
+            pass
+
+    _last_scan = (time.time(), list(instances.values()), chrome_running)
+    return _last_scan[1], _last_scan[2]
+
+def _still_registered_process(instance):
+    """Whether the recorded pid is still the Chrome that was started on this port with this profile.
+    Ports are picked at random and get reused, so an answer on the port alone proves little."""
+    pid = instance.get("pid")
+    if not pid or not psutil.pid_exists(pid):
+        return False
+    try:
+        cmdline = psutil.Process(pid).cmdline()
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return False
+    return (_option_value(cmdline, '--remote-debugging-port') == str(instance.get("port")) and
+            _option_value(cmdline, '--user-data-dir') == instance.get("user_data_dir"))
+
+def find_debugging_instances(registry_path=None):
+    """Return every Chrome instance with a live remote debugging endpoint.
+
+    Instances in the registry are checked first: the recorded process must still
+    be that Chrome and its port must answer /json/version. The process table is
+    only scanned when none of them passes. Registry entries that fail are dropped."""
+    registry_path = registry_path or get_registry_path()
+    registered = _read_registry(registry_path)
+    live = [instance for instance in registered
+            if _still_registered_process(instance) and probe(instance.get("port"))]
+    if len(live) != len(registered):
+        _write_registry(registry_path, live)
+    if live:
+        return live
+
+    instances, _ = scan_chrome_processes()
+    # A port on the command line doesn't mean Chrome is still listening on it
+    return [instance for instance in instances if probe(instance["port"])]
+
+def find_existing_chrome_debugging_port(user_data_dir=None):
+    """Return the port of a Chrome instance with remote debugging enabled, or None.
+    With user_data_dir, an instance using that profile is preferred."""
+    instances = find_debugging_instances()
+    if not instances:
+        return None
+    if user_data_dir:
+        wanted = os.path.normcase(os.path.abspath(user_data_dir))
+        for instance in instances:
+            if instance.get("user_data_dir") and os.path.normcase(os.path.abspath(instance["user_data_dir"])) == wanted:
+                return instance["port"]
+    return instances[0]["port"]
+
+def is_chrome_running():
+    """Check if Chrome is running on the system"""
+    return scan_chrome_processes()[1]
+
+def wait_for_debugging_port(port, timeout=10, interval=0.1):
+    """Wait until a freshly started Chrome answers on its debugging port. Returns the version info or None."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        info = probe(port)
+        if info:
+            return info
+        time.sleep(interval)
+    return None
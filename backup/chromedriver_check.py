@@ -0,0 +1,73 @@
+import os
+import re
+import json
+import subprocess
+from download_chromedriver import find_chrome_binary, get_chrome_version
+
+# Records the last ChromeDriver/Chrome pair found to match, keyed by both
+# binaries' paths and modification times, so later runs only need two stats
+DEFAULT_STAMP_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'browser-automation', 'chromedriver_stamp.json')
+
+def get_chromedriver_version(chromedriver_path):
+    """Return the version printed by `chromedriver --version`, or None"""
+    try:
+        output = subprocess.run([chromedriver_path, "--version"], capture_output=True, timeout=15).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = re.search(r'ChromeDriver ([\d.]+)', output.decode('utf-8', errors='ignore'))
+    return match.group(1) if match else None
+
+def _binary_key(path):
+    # Resolve symlinks, so switching the active ChromeDriver in the store changes the key
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    return [path, stat.st_mtime_ns, stat.st_size]
+
+def _read_stamp(path):
+    try:
+        with open(path, encoding="utf-8") as stamp_file:
+            return json.load(stamp_file)
+    except (OSError, ValueError):
+        return None
+
+def _write_stamp(path, stamp):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as stamp_file:
+            json.dump(stamp, stamp_file)
+        os.replace(temporary, path)
+    except OSError:
+        pass  # Only costs a version check next time
+
+def check_chromedriver_compatibility(chromedriver_path, stamp_path=None):
+    """Return (compatible, chrome_version, chromedriver_version).
+
+    compatible is True when both binaries share a major version, False when they
+    don't, and None when the Chrome version couldn't be determined. A matching
+    pair is remembered in the stamp file, so as long as neither binary changes
+    the answer comes from two stat calls instead of running either of them."""
+    stamp_path = stamp_path or os.environ.get("CHROMEDRIVER_STAMP_PATH") or DEFAULT_STAMP_PATH
+    chrome_path = find_chrome_binary()
+    key = {
+        "chromedriver": _binary_key(chromedriver_path),
+        "chrome": _binary_key(chrome_path) if chrome_path else None,
+    }
+
+    stamp = _read_stamp(stamp_path)
+    if stamp and key["chrome"] and stamp.get("key") == key:
+        return True, stamp["chrome_version"], stamp["chromedriver_version"]
+
+    chromedriver_version = get_chromedriver_version(chromedriver_path)
+    chrome_version = get_chrome_version(interactive=False)
+    if not chrome_version or not chromedriver_version:
+        return None, chrome_version, chromedriver_version
+
+    compatible = chrome_version.split(".")[0] == chromedriver_version.split(".")[0]
+    if compatible and key["chrome"]:
+        _write_stamp(stamp_path, {
+            "key": key,
+            "chrome_version": chrome_version,
+            "chromedriver_version": chromedriver_version,
+        })
+    return compatible, chrome_version, chromedriver_version
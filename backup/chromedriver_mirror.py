@@ -0,0 +1,84 @@
+import os
+import json
+import argparse
+from cft_metadata import (LATEST_PER_MILESTONE_URL, KNOWN_GOOD_VERSIONS_URL, fetch_metadata,
+                          find_chromedriver_download, mirror_relative_path, parse_version)
+from chromedriver_store import download_file
+
+# Every platform Chrome for Testing publishes ChromeDriver for
+PLATFORMS = ["linux64", "mac-arm64", "mac-x64", "win32", "win64"]
+
+def _write_json(path, data):
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as json_file:
+        json.dump(data, json_file)
+    os.replace(temporary, path)
+
+def prefetch(output_dir, milestones=None, latest=None, platforms=PLATFORMS, known_good=True):
+    """Fill output_dir with the Chrome for Testing metadata and the ChromeDriver zips for
+    the given milestones (or the `latest` newest ones) and platforms.
+
+    The directory can then be used as a mirror as it is, or served over the LAN
+    (e.g. `python -m http.server --directory DIR`). Zips already there are kept,
+    so running it again only fetches new builds."""
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Always from upstream, whatever CHROMEDRIVER_MIRROR says
+    latest_data = fetch_metadata(LATEST_PER_MILESTONE_URL, mirror="")
+    _write_json(os.path.join(output_dir, LATEST_PER_MILESTONE_URL.rsplit("/", 1)[-1]), latest_data)
+    if known_good:
+        _write_json(os.path.join(output_dir, KNOWN_GOOD_VERSIONS_URL.rsplit("/", 1)[-1]),
+                    fetch_metadata(KNOWN_GOOD_VERSIONS_URL, mirror=""))
+
+    if not milestones:
+        available = sorted(latest_data.get("milestones", {}), key=lambda milestone: parse_version(milestone))
+        milestones = available[-(latest or 1):]
+
+    fetched = 0
+    for milestone in milestones:
+        for platform_name in platforms:
+            match = find_chromedriver_download(milestone, platform_name, mirror="")
+            if not match:
+                print(f"No ChromeDriver for Chrome {milestone} on {platform_name}; skipping.")
+                continue
+            version, url = match
+            destination = os.path.join(output_dir, *mirror_relative_path(url).split("/"))
+            if os.path.exists(destination):
+                print(f"Already mirrored: ChromeDriver {version} ({platform_name})")
+                continue
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            print(f"Mirroring ChromeDriver {version} ({platform_name})...")
+            temporary = f"{destination}.{os.getpid()}.tmp"
+            try:
+                download_file(url, temporary)
+                os.replace(temporary, destination)
+            finally:
+                if os.path.exists(temporary):
+                    os.remove(temporary)
+            fetched += 1
+
+    print(f"\nMirror at {output_dir} is ready ({fetched} new downloads).")
+    print(f"Point the downloaders at it with --mirror {output_dir} or CHROMEDRIVER_MIRROR={output_dir}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Prefetch ChromeDriver builds into a local mirror for offline '
+                                                 'or LAN provisioning')
+    parser.add_argument('output', help='Directory to fill (created if needed)')
+    parser.add_argument('--milestones', nargs='+', metavar='N', default=None,
+                        help='Chrome milestones to mirror, e.g. 135 136 (default: the newest one)')
+    parser.add_argument('--latest', type=int, default=None, metavar='N',
+                        help='Mirror the N newest milestones instead of naming them')
+    parser.add_argument('--platforms', nargs='+', choices=PLATFORMS, default=PLATFORMS,
+                        help='Platforms to mirror (default: all)')
+    parser.add_argument('--no-known-good', action='store_true',
+                        help='Leave out the full version history file (only needed for milestones '
+                             'missing from the per-milestone file)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    prefetch(args.output, milestones=args.milestones, latest=args.latest, platforms=args.platforms,
+             known_good=not args.no_known_good)
+
+if __name__ == "__main__":
+    main()
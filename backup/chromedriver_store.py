@@ -0,0 +1,148 @@
+import os
+import json
+import stat
+import base64
+import shutil
+import hashlib
+import zipfile
+import platform
+import tempfile
+import requests
+
+# Every downloaded ChromeDriver is kept here as <version>-<platform>/chromedriver,
+# so several versions live side by side and switching between them doesn't
+# mean downloading again
+DEFAULT_STORE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'browser-automation', 'chromedriver')
+
+CHUNK_SIZE = 1024 * 1024
+
+def get_store_dir():
+    return os.environ.get("CHROMEDRIVER_STORE") or DEFAULT_STORE_DIR
+
+def chromedriver_name(system=None):
+    return "chromedriver.exe" if (system or platform.system()) == "Windows" else "chromedriver"
+
+def entry_path(version, platform_name, store_dir=None):
+    return os.path.join(store_dir or get_store_dir(), f"{version}-{platform_name}")
+
+def installed_versions(store_dir=None):
+    """Return (version, platform, binary path) for every ChromeDriver in the store"""
+    store_dir = store_dir or get_store_dir()
+    entries = []
+    if not os.path.isdir(store_dir):
+        return entries
+    for name in sorted(os.listdir(store_dir)):
+        manifest_path = os.path.join(store_dir, name, "manifest.json")
+        try:
+            with open(manifest_path, encoding="utf-8") as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            continue  # Not an entry (or a temporary directory)
+        entries.append((manifest["version"], manifest["platform"], os.path.join(store_dir, name, manifest["binary"])))
+    return entries
+
+def _expected_md5(response):
+    # Google Cloud Storage (which serves both Chrome for Testing and the legacy
+    # downloads) sends an MD5 of the object as x-goog-hash: ...,md5=<base64>
+    for part in response.headers.get("x-goog-hash", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name == "md5" and value:
+            return base64.b64decode(value).hex()
+    return None
+
+def download_file(url, destination):
+    """Stream url to destination, verifying its length and MD5 when the server provides them.
+    A local path or file:// URL (a mirror directory) is simply copied."""
+    if not url.startswith(("http://", "https://")):
+        shutil.copyfile(url[len("file://"):] if url.startswith("file://") else url, destination)
+        return
+    with requests.get(url, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        md5 = hashlib.md5()
+        size = 0
+        with open(destination, "wb") as download_file:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                download_file.write(chunk)
+                md5.update(chunk)
+                size += len(chunk)
+        expected_size = response.headers.get("Content-Length")
+        # Content-Length is the compressed size when the body was served with Content-Encoding
+        if expected_size and not response.headers.get("Content-Encoding") and int(expected_size) != size:
+            raise IOError(f"Download of {url} is incomplete ({size} of {expected_size} bytes)")
+        expected_md5 = _expected_md5(response)
+        if expected_md5 and expected_md5 != md5.hexdigest():
+            raise IOError(f"Checksum mismatch for {url}")
+
+def install(download_url, version, platform_name, store_dir=None, sha256=None):
+    """Make sure the store holds ChromeDriver `version` for `platform_name` and return its binary.
+
+    The zip is streamed to disk and checked (length, server MD5, zip CRCs, and
+    sha256 of the binary when given), only the chromedriver binary is unpacked,
+    and the finished entry appears with a single rename. Concurrent installs of
+    the same version simply let the first one win."""
+    store_dir = store_dir or get_store_dir()
+    entry = entry_path(version, platform_name, store_dir)
+    binary_name = chromedriver_name("Windows" if platform_name.startswith("win") else None)
+    binary = os.path.join(entry, binary_name)
+    if os.path.exists(os.path.join(entry, "manifest.json")):
+        print(f"ChromeDriver {version} ({platform_name}) is already in the store.")
+        return binary
+
+    os.makedirs(store_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".staging-", dir=store_dir)
+    try:
+        archive = os.path.join(staging, "download.zip")
+        print(f"Downloading ChromeDriver {version}...")
+        download_file(download_url, archive)
+
+        with zipfile.ZipFile(archive) as zip_file:
+            broken = zip_file.testzip()
+            if broken:
+                raise IOError(f"Corrupt file in ChromeDriver archive: {broken}")
+            # Chrome for Testing zips nest the binary in chromedriver-<platform>/, legacy zips don't
+            members = [name for name in zip_file.namelist() if os.path.basename(name) == binary_name]
+            if not members:
+                raise IOError("Could not find ChromeDriver executable in the downloaded package.")
+            staged_entry = os.path.join(staging, "entry")
+            os.makedirs(staged_entry)
+            with zip_file.open(members[0]) as source, open(os.path.join(staged_entry, binary_name), "wb") as target:
+                shutil.copyfileobj(source, target)
+
+        staged_binary = os.path.join(staged_entry, binary_name)
+        with open(staged_binary, "rb") as binary_file:
+            digest = hashlib.sha256(binary_file.read()).hexdigest()
+        if sha256 and digest != sha256:
+            raise IOError(f"Checksum mismatch for ChromeDriver {version}")
+        os.chmod(staged_binary, os.stat(staged_binary).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        with open(os.path.join(staged_entry, "manifest.json"), "w", encoding="utf-8") as manifest_file:
+            json.dump({"version": version, "platform": platform_name, "binary": binary_name,
+                       "sha256": digest, "url": download_url}, manifest_file)
+
+        try:
+            os.rename(staged_entry, entry)
+        except OSError:
+            if not os.path.exists(os.path.join(entry, "manifest.json")):
+                raise
+            # Another process installed the same version first; theirs is just as good
+        print(f"ChromeDriver {version} stored at {entry}")
+        return binary
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+def activate(binary, link_path):
+    """Point link_path at a stored binary, atomically, so running processes never see a half-written file.
+
+    A symlink is swapped in with a rename; where symlinks aren't allowed (Windows
+    without developer mode) a copy is renamed into place instead."""
+    temporary = f"{link_path}.{os.getpid()}.tmp"
+    try:
+        os.symlink(binary, temporary)
+    except (OSError, NotImplementedError):
+        shutil.copy2(binary, temporary)
+    try:
+        os.replace(temporary, link_path)
+    except OSError:
+        if os.path.lexists(temporary):
+            os.remove(temporary)
+        raise
+    return link_path
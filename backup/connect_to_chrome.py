@@ -3,7 +3,7 @@ import sys
 import time
 import platform
 import random
-import psutil
+from chrome_instances import find_existing_chrome_debugging_port
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
@@ -12,20 +12,6 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-def find_existing_chrome_debugging_port():
-    """Check if Chrome is already running with remote debugging enabled and get the port"""
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-        try:
-            cmdline = proc.info.get('cmdline', [])
-            if cmdline and any('chrome' in cmd.lower() for cmd in cmdline):
-                for cmd in cmdline:
-                    if '--remote-debugging-port=' in cmd:
-                        port = cmd.split('=')[1]
-                        return int(port)
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess, ValueError):
-            pass
-    return None
-
 def human_like_typing(element, text):
     """Type text with random delays like a human would"""
     for char in text:
@@ -4,13 +4,42 @@ import platform
 import re
 import subprocess
 import requests
-import zipfile
-import io
 import json
-import winreg
+import argparse
+import shutil
+import chromedriver_store
+from cft_metadata import find_chromedriver_download, get_mirror
 
-def get_chrome_version():
-    """Detect installed Chrome version across different platforms"""
+# The registry is only there on Windows; importing this module elsewhere
+# (e.g. for get_chrome_version) must still work
+try:
+    import winreg
+except ImportError:
+    winreg = None
+
+def find_chrome_binary():
+    """Return the path of the installed Chrome executable, or None if it can't be found"""
+    system = platform.system()
+    if system == "Windows":
+        candidates = [
+            os.path.join(os.environ.get('PROGRAMFILES', 'C:\\Program Files'), 'Google\\Chrome\\Application\\chrome.exe'),
+            os.path.join(os.environ.get('PROGRAMFILES(X86)', 'C:\\Program Files (x86)'), 'Google\\Chrome\\Application\\chrome.exe'),
+            os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Google\\Chrome\\Application\\chrome.exe')
+        ]
+    elif system == "Darwin":  # macOS
+        candidates = ['/Applications/Google Chrome.app/Contents/MacOS/Google Chrome']
+    else:
+        candidates = [shutil.which(name) for name in ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser']]
+    
+    for path in candidates:
+        if path and os.path.exists(path):
+            # Follow launcher symlinks so the stat belongs to the installed binary
+            return os.path.realpath(path)
+    return None
+
+def get_chrome_version(interactive=True):
+    """Detect installed Chrome version across different platforms (asking the user
+    as a last resort, unless interactive is False)"""
     print("Detecting installed Chrome version...")
     version = None
     system = platform.system()
@@ -89,7 +118,7 @@ def get_chrome_version():
                     pass
                     
         # If we couldn't detect automatically, ask the user
-        if not version:
+        if not version and interactive:
             print("\nUnable to automatically detect Chrome version.")
             print("Please check your Chrome version by going to chrome://version in your browser")
             user_input = input("\nEnter your Chrome version (e.g., 136.0.7103.93): ")
@@ -101,8 +130,20 @@ def get_chrome_version():
     
     return None
 
-def get_chromedriver_for_version(chrome_version):
-    """Download the correct ChromeDriver for the detected Chrome version using Chrome for Testing API"""
+def get_platform_name():
+    """The Chrome for Testing platform name for this machine, or None if it has no builds"""
+    system = platform.system()
+    if system == "Windows":
+        return "win64"  # Chrome for Testing uses win64 instead of win32
+    if system == "Darwin":  # macOS
+        return "mac-arm64" if platform.machine() == "arm64" else "mac-x64"
+    if system == "Linux":
+        return "linux64"
+    return None
+
+def get_chromedriver_for_version(chrome_version, mirror=None):
+    """Download the correct ChromeDriver for the detected Chrome version using Chrome for Testing API
+    (or a mirror of it, see cft_metadata.get_mirror)"""
     # Extract major version number
     major_version = chrome_version.split('.')[0] if chrome_version else None
     
@@ -114,71 +155,40 @@ def get_chromedriver_for_version(chrome_version):
     
     # Determine system platform for download
     system = platform.system()
-    if system == "Windows":
-        platform_name = "win64"  # Chrome for Testing uses win64 instead of win32
-    elif system == "Darwin":  # macOS
-        if platform.machine() == "arm64":
-            platform_name = "mac-arm64"
-        else:
-            platform_name = "mac-x64"
-    elif system == "Linux":
-        platform_name = "linux64"
-    else:
+    platform_name = get_platform_name()
+    if not platform_name:
         print(f"Unsupported platform: {system}")
         return False
     
     try:
-        # Get known good versions from Chrome for Testing API
-        known_good_url = "https://googlechromelabs.github.io/chrome-for-testing/known-good-versions-with-downloads.json"
-        response = requests.get(known_good_url)
-        response.raise_for_status()
-        
-        versions_data = response.json()
-        
-        # Find versions matching our major version
-        matching_versions = []
-        for version in versions_data.get("versions", []):
-            if version.get("version", "").startswith(f"{major_version}."):
-                # Check if it has chromedriver downloads
-                if "chromedriver" in version.get("downloads", {}):
-                    matching_versions.append(version)
-        
-        if not matching_versions:
-            print(f"No ChromeDriver found for Chrome {major_version} in the Chrome for Testing API.")
+        # Look the milestone up in the locally cached Chrome for Testing metadata,
+        # which is only downloaded again when it has changed
+        match = find_chromedriver_download(major_version, platform_name, mirror=mirror)
+        if not match:
+            print(f"No ChromeDriver found for Chrome {major_version} on {platform_name} in the Chrome for Testing API.")
             # Try fallback for older versions
-            return download_chromedriver_fallback(major_version, platform_name)
-        
-        # Sort versions and get the latest one for this major version
-        matching_versions.sort(key=lambda x: x["version"], reverse=True)
-        latest_version = matching_versions[0]
-        version_number = latest_version["version"]
-        
-        # Find the download URL for the current platform
-        chromedriver_downloads = latest_version.get("downloads", {}).get("chromedriver", [])
-        download_url = None
-        
-        for download in chromedriver_downloads:
-            if download.get("platform") == platform_name:
-                download_url = download.get("url")
-                break
-        
-        if not download_url:
-            print(f"No ChromeDriver download available for {platform_name} platform.")
-            return False
+            return download_chromedriver_fallback(major_version, platform_name, mirror)
+        version_number, download_url = match
         
         print(f"Found ChromeDriver version {version_number} for Chrome {major_version}")
         print(f"URL: {download_url}")
         
         # Download and install the driver
-        return download_and_install_chromedriver(download_url, platform_name, system)
+        return download_and_install_chromedriver(download_url, platform_name, system, version=version_number)
     
     except Exception as e:
         print(f"Error while fetching ChromeDriver: {str(e)}")
         # Try fallback method
-        return download_chromedriver_fallback(major_version, platform_name)
+        return download_chromedriver_fallback(major_version, platform_name, mirror)
 
-def download_chromedriver_fallback(major_version, platform_name):
+def download_chromedriver_fallback(major_version, platform_name, mirror=None):
     """Fallback method for older Chrome versions or when the API fails"""
+    if get_mirror(mirror):
+        # Mirrors only hold Chrome for Testing builds, and a mirrored worker may have no internet at all
+        print(f"The mirror has no ChromeDriver for Chrome {major_version} on {platform_name}.")
+        print("Add it with: python chromedriver_mirror.py DIR --milestones " + str(major_version))
+        return False
+    
     print("Trying fallback method to download ChromeDriver...")
     
     system = platform.system()
@@ -204,7 +214,8 @@ def download_chromedriver_fallback(major_version, platform_name):
             print(f"Found legacy ChromeDriver version {driver_version} for Chrome {major_version}")
             print(f"URL: {download_url}")
             
-            return download_and_install_chromedriver(download_url, platform_name, system, is_legacy=True)
+            return download_and_install_chromedriver(download_url, platform_name, system, is_legacy=True,
+                                                     version=driver_version)
         else:
             print(f"Couldn't find a compatible ChromeDriver for Chrome {major_version}.")
             print("Try downloading manually from: https://chromedriver.chromium.org/downloads")
@@ -214,84 +225,67 @@ def download_chromedriver_fallback(major_version, platform_name):
         print(f"Error in fallback ChromeDriver download: {str(e)}")
         return False
 
-def download_and_install_chromedriver(download_url, platform_name, system, is_legacy=False):
-    """Download and install ChromeDriver from the given URL"""
+def download_and_install_chromedriver(download_url, platform_name, system, is_legacy=False, version=None):
+    """Put ChromeDriver from the given URL into the versioned store and make it the active one"""
     try:
-        # Download the ChromeDriver zip
-        print("Downloading ChromeDriver...")
-        response = requests.get(download_url)
-        response.raise_for_status()
-        
-        # Get the current directory
-        destination = os.path.dirname(os.path.abspath(__file__))
-        
-        # Extract the zip
-        print("Extracting ChromeDriver...")
-        z = zipfile.ZipFile(io.BytesIO(response.content))
-        z.extractall(destination)
-        
-        chromedriver_name = "chromedriver.exe" if system == "Windows" else "chromedriver"
-        chromedriver_path_dest = os.path.join(destination, chromedriver_name)
-        
-        # Remove existing ChromeDriver if present
-        if os.path.exists(chromedriver_path_dest):
-            print(f"Removing existing ChromeDriver at {chromedriver_path_dest}")
-            os.remove(chromedriver_path_dest)
-        
-        # For newer Chrome for Testing downloads, the zip contains a folder structure
-        if not is_legacy:
-            chromedriver_folder = os.path.join(destination, f"chromedriver-{platform_name}")
-            chromedriver_path_in_zip = os.path.join(chromedriver_folder, chromedriver_name)
-        else:
-            # Legacy downloads have the executable directly in the zip
-            chromedriver_path_in_zip = os.path.join(destination, chromedriver_name)
-        
-        # Make sure the source file exists
-        if os.path.exists(chromedriver_path_in_zip):
-            import shutil
-            shutil.move(chromedriver_path_in_zip, chromedriver_path_dest)
-            print(f"Moved ChromeDriver to {chromedriver_path_dest}")
-        else:
-            # If the expected path is not found, try to find chromedriver in the extracted files
-            print("ChromeDriver not found at expected location, searching for it...")
-            found = False
-            for root, _, files in os.walk(destination):
-                for file in files:
-                    if file == chromedriver_name:
-                        file_path = os.path.join(root, file)
-                        if file_path != chromedriver_path_dest:
-                            import shutil
-                            shutil.move(file_path, chromedriver_path_dest)
-                            print(f"Found and moved ChromeDriver to {chromedriver_path_dest}")
-                            found = True
-                            break
-                if found:
-                    break
-            
-            if not found:
-                print("Could not find ChromeDriver executable in the downloaded package.")
-                return False
+        # Both Chrome for Testing and legacy URLs carry the version as a path segment
+        if not version:
+            match = re.search(r'/(\d+(?:\.\d+)+)/', download_url)
+            version = match.group(1) if match else "unknown"
         
-        # Make executable on Unix-based systems
-        if system in ["Darwin", "Linux"]:
-            print("Setting executable permissions...")
-            subprocess.check_call(['chmod', '+x', chromedriver_path_dest])
+        # Download (or reuse) the stored copy of this version
+        binary = chromedriver_store.install(download_url, version, platform_name)
         
-        # Clean up any extracted folders that might remain
-        for item in os.listdir(destination):
-            item_path = os.path.join(destination, item)
-            if os.path.isdir(item_path) and "chromedriver-" in item:
-                import shutil
-                shutil.rmtree(item_path)
+        # Point the chromedriver next to this script at it
+        destination = os.path.dirname(os.path.abspath(__file__))
+        chromedriver_path_dest = os.path.join(destination, chromedriver_store.chromedriver_name(system))
+        chromedriver_store.activate(binary, chromedriver_path_dest)
         
-        print(f"ChromeDriver successfully installed at: {chromedriver_path_dest}")
+        print(f"ChromeDriver {version} successfully installed at: {chromedriver_path_dest}")
         return True
     
     except Exception as e:
         print(f"Error downloading and installing ChromeDriver: {str(e)}")
         return False
 
+def use_stored_version(version):
+    """Switch the active ChromeDriver to a version already in the store"""
+    destination = os.path.dirname(os.path.abspath(__file__))
+    # The store may be shared with other machines; a driver built for another platform won't run here
+    wanted_platform = get_platform_name()
+    for stored_version, platform_name, binary in chromedriver_store.installed_versions():
+        if platform_name != wanted_platform:
+            continue
+        if stored_version == version or stored_version.split('.')[0] == version:
+            link = chromedriver_store.activate(binary, os.path.join(destination, chromedriver_store.chromedriver_name()))
+            print(f"Now using ChromeDriver {stored_version} ({platform_name}) at {link}")
+            return True
+    print(f"ChromeDriver {version} for {wanted_platform or platform.system()} is not in the store. "
+          f"Run without --use to download it.")
+    return False
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Download the ChromeDriver matching the installed Chrome')
+    parser.add_argument('--list', action='store_true',
+                        help='List the ChromeDriver versions in the local store and exit')
+    parser.add_argument('--use', metavar='VERSION', default=None,
+                        help='Switch to a stored ChromeDriver version (full version or milestone) without downloading')
+    parser.add_argument('--mirror', metavar='URL_OR_DIR', default=None,
+                        help='Get the metadata and zips from a mirror made by chromedriver_mirror.py '
+                             '(default: $CHROMEDRIVER_MIRROR, else Chrome for Testing)')
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    
+    if args.list:
+        for version, platform_name, binary in chromedriver_store.installed_versions():
+            print(f"{version:<20} {platform_name:<10} {binary}")
+        return
+    if args.use:
+        use_stored_version(args.use)
+        return
+    
     print("ChromeDriver Auto-Downloader")
     print("============================\n")
     
@@ -305,7 +299,7 @@ def main():
     print(f"Detected Chrome version: {chrome_version}")
     
     # Step 2: Download matching ChromeDriver
-    success = get_chromedriver_for_version(chrome_version)
+    success = get_chromedriver_for_version(chrome_version, mirror=args.mirror)
     
     if success:
         print("\nSetup complete! You can now run the AI Search Assistant.")
@@ -0,0 +1,251 @@
+import os
+import re
+
+# Parser backends in order of preference; the first importable one is used
+# unless HTML_PARSER_BACKEND names a specific backend
+BACKEND_PREFERENCE = ["selectolax", "lxml", "bs4"]
+
+class SimpleSelector:
+    """A compiled `tag.class[attr]` selector that can be tested against a single element"""
+    PATTERN = re.compile(r'^([a-zA-Z][a-zA-Z0-9]*)?((?:\.[\w-]+|\[[\w-]+\])*)$')
+
+    def __init__(self, selector):
+        match = self.PATTERN.match(selector.strip())
+        if not match or not selector.strip():
+            raise ValueError(f"Unsupported selector: {selector!r}")
+        self.selector = selector
+        self.tag = (match.group(1) or "").lower() or None
+        self.classes = frozenset(re.findall(r'\.([\w-]+)', match.group(2)))
+        self.attributes = tuple(re.findall(r'\[([\w-]+)\]', match.group(2)))
+
+    def matches(self, tag, classes, attributes):
+        if self.tag and tag != self.tag:
+            return False
+        if self.classes and not self.classes.issubset(classes):
+            return False
+        return all(name in attributes for name in self.attributes)
+
+class SelectorCascade:
+    """Fallback selectors compiled once and evaluated together in one pass over the tree"""
+
+    def __init__(self, selectors):
+        self.selectors = [SimpleSelector(selector) for selector in selectors]
+
+    def select(self, backend, node):
+        """Return the matches of the first selector in the cascade that matches anything"""
+        buckets = [[] for _ in self.selectors]
+        best = len(self.selectors)
+        for element in backend.iter_descendants(node):
+            tag, classes, attributes = backend.describe(element)
+            # Lower-priority selectors stop mattering once a better one has matched
+            for index in range(min(best + 1, len(self.selectors))):
+                if self.selectors[index].matches(tag, classes, attributes):
+                    buckets[index].append(element)
+                    best = min(best, index)
+                    break
+        return buckets[best] if best < len(self.selectors) else []
+
+    def select_one(self, backend, node):
+        """Return the first element matched by the highest-priority selector"""
+        found = [None] * len(self.selectors)
+        for element in backend.iter_descendants(node):
+            tag, classes, attributes = backend.describe(element)
+            for index, selector in enumerate(self.selectors):
+                if found[index] is None and selector.matches(tag, classes, attributes):
+                    found[index] = element
+            # Nothing can beat a match for the first selector
+            if found[0] is not None:
+                break
+        return next((element for element in found if element is not None), None)
+
+class Bs4Backend:
+    """Pure-Python fallback backed by BeautifulSoup's html.parser"""
+    name = "bs4"
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self._soup = BeautifulSoup
+
+    def parse(self, html):
+        return self._soup(html, 'html.parser')
+
+    def iter_descendants(self, node):
+        return node.find_all(True)
+
+    def find_all(self, node, tag):
+        return node.find_all(tag)
+
+    def describe(self, element):
+        return element.name, element.get('class') or (), element.attrs
+
+    def attribute(self, element, name):
+        value = element.get(name)
+        # class and other multi-valued attributes come back as lists; the other backends give the raw string
+        return " ".join(value) if isinstance(value, list) else value
+
+    def parent(self, element):
+        return element.parent
+
+    def key(self, element):
+        return id(element)
+
+    def text(self, element):
+        return element.get_text()
+
+    def title(self, root):
+        return root.title.string if root.title else None
+
+    def remove(self, root, tags):
+        for element in root(tags):
+            element.extract()
+
+    def get_text(self, root, separator='\n'):
+        return root.get_text(separator=separator)
+
+class LxmlBackend:
+    """libxml2-based backend via lxml.html"""
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        from lxml import etree
+        self._html = lxml.html
+        self._etree = etree
+
+    def parse(self, html):
+        if isinstance(html, str):
+            # lxml refuses str input carrying an XML encoding declaration
+            html = html.encode('utf-8')
+        parser = self._html.HTMLParser(encoding='utf-8')
+        try:
+            return self._html.document_fromstring(html, parser=parser)
+        except self._etree.ParserError:
+            # Whitespace, comments or an XML declaration alone make lxml give up on
+            # the document; the other backends return an empty one, so do the same
+            return self._html.document_fromstring("<html><body></body></html>")
+
+    def iter_descendants(self, node):
+        # Passing Element skips comments and processing instructions
+        iterator = node.iter(self._etree.Element)
+        next(iterator, None)  # iter() starts with the node itself
+        return iterator
+
+    def find_all(self, node, tag):
+        return node.iterdescendants(tag)
+
+    def describe(self, element):
+        return element.tag, (element.get('class') or '').split(), element.attrib
+
+    def attribute(self, element, name):
+        return element.get(name)
+
+    def parent(self, element):
+        return element.getparent()
+
+    def key(self, element):
+        # lxml hands out the same proxy for an element while it is referenced
+        return element
+
+    def text(self, element):
+        return element.text_content()
+
+    def title(self, root):
+        title = root.find('.//title')
+        return title.text_content() if title is not None else None
+
+    def remove(self, root, tags):
+        for element in list(root.iter(*tags)):
+            element.drop_tree()
+
+    def get_text(self, root, separator='\n'):
+        return separator.join(root.itertext(self._etree.Element))
+
+class SelectolaxBackend:
+    """Lexbor-engine backend via selectolax"""
+    name = "selectolax"
+
+    def __init__(self):
+        try:
+            from selectolax.lexbor import LexborHTMLParser as HTMLParser
+        except ImportError:
+            # Releases before lexbor support only ship the Modest engine
+            from selectolax.parser import HTMLParser
+        self._parser = HTMLParser
+
+    def parse(self, html):
+        return self._parser(html)
+
+    def iter_descendants(self, node):
+        if hasattr(node, 'root'):
+            node = node.root
+        if node is None:
+            return iter(())
+        iterator = node.traverse()
+        next(iterator, None)  # traverse() starts with the node itself
+        return iterator
+
+    def find_all(self, node, tag):
+        return node.css(tag)
+
+    def describe(self, element):
+        attributes = element.attributes
+        return element.tag, (attributes.get('class') or '').split(), attributes
+
+    def attribute(self, element, name):
+        return element.attributes.get(name)
+
+    def parent(self, element):
+        return element.parent
+
+    def key(self, element):
+        # Node objects are created per access, so identify them by the underlying node
+        return element.mem_id
+
+    def text(self, element):
+        return element.text(deep=True)
+
+    def title(self, root):
+        title = root.css_first('title')
+        return title.text() if title is not None else None
+
+    def remove(self, root, tags):
+        root.strip_tags(tags)
+
+    def get_text(self, root, separator='\n'):
+        node = root.root
+        return node.text(deep=True, separator=separator) if node is not None else ""
+
+BACKENDS = {
+    "bs4": Bs4Backend,
+    "lxml": LxmlBackend,
+    "selectolax": SelectolaxBackend,
+}
+
+_backend_cache = {}
+
+def get_backend(name=None):
+    """Return the requested parser backend, or the fastest one that is installed"""
+    name = name or os.environ.get("HTML_PARSER_BACKEND")
+    candidates = [name] if name else BACKEND_PREFERENCE
+    for candidate in candidates:
+        if candidate in _backend_cache:
+            return _backend_cache[candidate]
+        if candidate not in BACKENDS:
+            raise ValueError(f"Unknown HTML parser backend: {candidate}")
+        try:
+            backend = BACKENDS[candidate]()
+        except ImportError:
+            if name:
+                raise
+            continue
+        _backend_cache[candidate] = backend
+        return backend
+    raise ImportError("No HTML parser available. Install beautifulsoup4, lxml or selectolax.")
+
+def extract_title_and_text(html, remove_tags=("script", "style", "nav", "footer", "header"), backend=None):
+    """Parse a page and return its title and visible text with boilerplate tags removed"""
+    backend = backend or get_backend()
+    root = backend.parse(html)
+    title = backend.title(root)
+    backend.remove(root, list(remove_tags))
+    return title, backend.get_text(root, separator='\n')
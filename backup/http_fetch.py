@@ -0,0 +1,106 @@
+import re
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from main_content import DEFAULT_BUDGET, extract_main_content
+from serp_extraction import parse_search_results
+from batch_search import google_search_url
+
+# How pages are fetched:
+#   auto    - plain HTTP first, the browser only when the response looks like it needs JavaScript
+#   http    - plain HTTP only, whatever comes back
+#   browser - always navigate the browser (the old behaviour)
+FETCH_MODES = ["auto", "http", "browser"]
+
+# Pages with less visible text than this after boilerplate removal are
+# assumed to be rendered client-side and are loaded in the browser instead
+MIN_TEXT_CHARS = 500
+
+# Phrases that only show up on pages refusing to work without JavaScript
+JS_REQUIRED_MARKERS = [
+    "enable javascript",
+    "javascript is required",
+    "javascript is disabled",
+    "please turn on javascript",
+    "checking your browser",
+    "you need to enable javascript to run this app",
+]
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/136.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+_session = None
+
+def get_session():
+    """Return the shared session, so repeated fetches reuse pooled keep-alive connections"""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.headers.update(DEFAULT_HEADERS)
+        retries = Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504], allowed_methods=["GET"])
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retries)
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+    return _session
+
+def needs_browser(response, text, min_text_chars=MIN_TEXT_CHARS, markers=JS_REQUIRED_MARKERS):
+    """Return why an HTTP response isn't good enough to use as-is, or None if it is"""
+    if not 200 <= response.status_code < 300:
+        return f"HTTP {response.status_code}"
+    content_type = response.headers.get("Content-Type", "")
+    if content_type and "html" not in content_type:
+        return f"unexpected content type {content_type.split(';')[0]}"
+    visible = re.sub(r'\s+', ' ', text or '').strip()
+    if len(visible) < min_text_chars:
+        return f"only {len(visible)} characters of text"
+    lowered = visible[:2000].lower()
+    for marker in markers:
+        if marker in lowered:
+            return f"page asks for JavaScript ({marker!r})"
+    return None
+
+def fetch_page_over_http(url, timeout=10, min_text_chars=MIN_TEXT_CHARS, markers=JS_REQUIRED_MARKERS,
+                         budget=DEFAULT_BUDGET, etag=None, last_modified=None):
+    """Fetch a page with one HTTP request and return (page, reason), where page is the
+    extract_main_content() result plus the response's etag and last_modified validators;
+    reason is None when the page can be used and says why not otherwise.
+
+    With etag or last_modified the request is conditional, and a 304 answer comes
+    back as a page with not_modified set and nothing else extracted."""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    try:
+        response = get_session().get(url, timeout=timeout, headers=headers)
+    except requests.RequestException as e:
+        return {"title": None, "text": "", "truncated": False}, f"request failed: {e}"
+    if response.status_code == 304 and headers:
+        return {"not_modified": True}, None
+    if response.text:
+        page = extract_main_content(response.text, budget=budget)
+    else:
+        page = {"title": None, "text": "", "truncated": False}
+    page["etag"] = response.headers.get("ETag")
+    page["last_modified"] = response.headers.get("Last-Modified")
+    # A page filling its whole budget is never too short, so the budget caps min_text_chars
+    min_text_chars = min(min_text_chars, budget) if budget else min_text_chars
+    return page, needs_browser(response, page["text"], min_text_chars, markers)
+
+def fetch_serp_over_http(query, max_results=None, timeout=10):
+    """Try to get Google results without a browser; returns the results or None"""
+    try:
+        response = get_session().get(google_search_url(query), timeout=timeout)
+    except requests.RequestException:
+        return None
+    if response.status_code != 200:
+        return None
+    # Google serves a script-only page to clients it wants to challenge,
+    # which simply parses to no results
+    return parse_search_results(response.text, max_results=max_results, base_url=response.url) or None
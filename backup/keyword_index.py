@@ -0,0 +1,163 @@
+import os
+import re
+import math
+import sqlite3
+import hashlib
+import threading
+from collections import Counter
+
+# NumPy vectorizes scoring when it is installed; plain Python does the same sums otherwise
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'browser-automation', 'keyword_index.sqlite3')
+
+# BM25 term frequency saturation and document length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Function words and analysis boilerplate that never make a useful search term
+STOP_WORDS = frozenset("""
+a about above after again against all also although am an and any are as at be because been before being
+below between both but by can could did do does doing down during each either etc few for from further had
+has have having he her here hers him his how however i if in into is it its itself just may me might more
+most much must my no nor not now of off on once only or other our ours out over own per rather same she
+should since so some such than that the their theirs them then there these they this those through thus
+to too under until up upon very via was we were what when where whether which while who whom whose why
+will with within without would yet you your yours
+analysis analyze content information key overall page provide provides source sources summary text
+""".split())
+
+TOKEN = re.compile(r'[^\W\d_][\w\'-]*[^\W_]|[^\W\d_]')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT PRIMARY KEY,
+    df INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documents (
+    key TEXT PRIMARY KEY,
+    length INTEGER NOT NULL
+);
+"""
+
+def tokenize(text, min_length=3):
+    """Lower-cased words of at least min_length letters, without stop words or numbers"""
+    return [word for word in TOKEN.findall(text.lower())
+            if len(word) >= min_length and word not in STOP_WORDS]
+
+class KeywordIndex:
+    """Document frequencies of every page and response seen, persisted in SQLite, for
+    picking the terms that make a document distinctive (BM25 weights)."""
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("KEYWORD_INDEX_PATH") or DEFAULT_INDEX_PATH
+        directory = os.path.dirname(self.path) if self.path != ":memory:" else ""
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+        # The vocabulary lives in memory as term -> id plus a df array indexed by id;
+        # ids are only assigned in memory, so processes sharing the file never clash
+        self.vocabulary = {}
+        dfs = []
+        for term, df in self._db.execute("SELECT term, df FROM terms"):
+            self.vocabulary[term] = len(dfs)
+            dfs.append(df)
+        self._df = np.array(dfs, dtype=np.int64) if np else dfs
+        self.documents, total_length = self._db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM documents").fetchone()
+        self.total_length = total_length
+
+    def _grow(self, new_ids):
+        if np:
+            self._df = np.concatenate([self._df, np.zeros(len(new_ids), dtype=np.int64)])
+        else:
+            self._df.extend(0 for _ in new_ids)
+
+    def add_document(self, text, key=None):
+        """Count a document's terms once; documents already added under `key` (the URL,
+        or a hash of the text by default) are skipped so cached pages don't skew the table"""
+        key = key or hashlib.sha1(text.encode("utf-8")).hexdigest()
+        words = tokenize(text)
+        if not words:
+            return False
+        terms = set(words)
+        with self._lock:
+            with self._db:
+                if self._db.execute("SELECT 1 FROM documents WHERE key = ?", (key,)).fetchone():
+                    return False
+                self._db.executemany("INSERT INTO terms (term, df) VALUES (?, 1) "
+                                     "ON CONFLICT (term) DO UPDATE SET df = df + 1", ((term,) for term in terms))
+                self._db.execute("INSERT INTO documents (key, length) VALUES (?, ?)", (key, len(words)))
+
+            # Only once the rows are committed, so a failed insert leaves memory and file in step
+            new_terms = [term for term in terms if term not in self.vocabulary]
+            new_ids = range(len(self.vocabulary), len(self.vocabulary) + len(new_terms))
+            self.vocabulary.update(zip(new_terms, new_ids))
+            self._grow(new_ids)
+            ids = [self.vocabulary[term] for term in terms]
+            if np:
+                self._df[np.array(ids, dtype=np.int64)] += 1
+            else:
+                for term_id in ids:
+                    self._df[term_id] += 1
+            self.documents += 1
+            self.total_length += len(words)
+        return True
+
+    def keywords(self, text, count=5, exclude=()):
+        """Return the count terms of text with the highest BM25 weight against the index"""
+        counts = Counter(tokenize(text))
+        for word in exclude:
+            counts.pop(word.lower(), None)
+        if not counts:
+            return []
+
+        terms = list(counts)
+        documents = max(self.documents, 1)
+        average_length = self.total_length / self.documents if self.documents else sum(counts.values())
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * sum(counts.values()) / average_length)
+
+        with self._lock:
+            ids = [self.vocabulary.get(term, -1) for term in terms]
+            if np:
+                id_array = np.array(ids, dtype=np.int64)
+                known = id_array >= 0
+                df = np.zeros(len(ids), dtype=np.int64)
+                df[known] = self._df[id_array[known]]
+            else:
+                df = [self._df[term_id] if term_id >= 0 else 0 for term_id in ids]
+
+        if np:
+            tf = np.array([counts[term] for term in terms], dtype=np.float64)
+            idf = np.log1p((documents - df + 0.5) / (df + 0.5))
+            scores = idf * tf * (BM25_K1 + 1) / (tf + length_norm)
+            # Ties go to the term that appears first in the text
+            order = np.argsort(-scores, kind="stable")[:count]
+            return [terms[i] for i in order]
+
+        scores = []
+        for term, term_df in zip(terms, df):
+            tf = counts[term]
+            idf = math.log1p((documents - term_df + 0.5) / (term_df + 0.5))
+            scores.append(idf * tf * (BM25_K1 + 1) / (tf + length_norm))
+        order = sorted(range(len(terms)), key=lambda i: -scores[i])[:count]
+        return [terms[i] for i in order]
+
+    def close(self):
+        self._db.close()
+
+def open_keyword_index(enabled=True):
+    """Open the shared keyword index, or return None if it is disabled or can't be opened"""
+    if not enabled:
+        return None
+    try:
+        return KeywordIndex()
+    except (OSError, sqlite3.Error) as e:
+        print(f"Keyword index unavailable ({e}). Falling back to plain word counts.")
+        return None
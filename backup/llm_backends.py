@@ -0,0 +1,121 @@
+import os
+import abc
+import json
+import requests
+from requests.adapters import HTTPAdapter
+
+# How content is analysed:
+#   browser - type it into the chat.deepseek.com web UI (needs a logged-in browser)
+#   api     - send it straight to an OpenAI-compatible chat completions endpoint
+ANALYZERS = ["browser", "api"]
+
+DEFAULT_API_BASE_URL = "https://api.deepseek.com"
+DEFAULT_API_MODEL = "deepseek-chat"
+
+# Checked in order for the API key; keys are never taken on the command line
+API_KEY_VARIABLES = ["LLM_API_KEY", "DEEPSEEK_API_KEY"]
+
+def build_analysis_prompt(content):
+    """The request sent for one content dict (title, text, url), whichever analyzer sends it"""
+    if content.get("sources", 1) > 1:
+        # Packed by prompt_packing.pack_documents; each source carries its own header
+        return (f"Analyze these {content['sources']} sources together:\n\n{content['text']}\n\n"
+                "Provide a comprehensive analysis, extract key information, and note where the sources "
+                "agree or disagree.")
+    return (f"Analyze this content from {content['url']}:\n\nTitle: {content['title']}\n\n"
+            f"Content: {content['text']}\n\nProvide a comprehensive analysis and extract key information.")
+
+class Analyzer(abc.ABC):
+    """Turns page content into an analysis; stream() yields the reply text as it arrives"""
+
+    @abc.abstractmethod
+    def stream(self, content):
+        """Yield the analysis of a content dict piece by piece"""
+
+    def analyze(self, content):
+        """Print the reply as it streams in and return all of it"""
+        chunks = []
+        for delta in self.stream(content):
+            if not chunks:
+                print("\nResponse:")
+            print(delta, end="", flush=True)
+            chunks.append(delta)
+        if chunks:
+            print()
+        return "".join(chunks)
+
+class BrowserChatAnalyzer(Analyzer):
+    """Drives the DeepSeek chat UI through an AISearchAssistant or a browser daemon client"""
+
+    def __init__(self, assistant):
+        self.assistant = assistant
+
+    def stream(self, content):
+        yield from self.assistant.stream_deepseek(content)
+
+    def analyze(self, content):
+        # send_to_deepseek retries on UI hiccups and prints as it goes
+        return self.assistant.send_to_deepseek(content)
+
+class HTTPChatAnalyzer(Analyzer):
+    """Streams replies from an OpenAI-compatible /chat/completions endpoint over pooled connections"""
+
+    def __init__(self, base_url=None, model=None, api_key=None, timeout=120):
+        self.base_url = (base_url or os.environ.get("LLM_API_BASE_URL") or DEFAULT_API_BASE_URL).rstrip("/")
+        self.model = model or os.environ.get("LLM_API_MODEL") or DEFAULT_API_MODEL
+        self.api_key = api_key or next(filter(None, (os.environ.get(name) for name in API_KEY_VARIABLES)), None)
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+        if self.api_key:
+            self.session.headers["Authorization"] = f"Bearer {self.api_key}"
+
+    def stream_prompt(self, prompt):
+        """Yield the reply to a single user message as server-sent deltas arrive"""
+        response = self.session.post(
+            f"{self.base_url}/chat/completions",
+            json={"model": self.model, "messages": [{"role": "user", "content": prompt}], "stream": True},
+            stream=True,
+            timeout=(10, self.timeout)
+        )
+        with response:
+            if response.status_code != 200:
+                raise requests.HTTPError(f"HTTP {response.status_code} from {self.base_url}: {response.text[:200]}",
+                                         response=response)
+            # Server-sent events are UTF-8 whatever the headers say
+            response.encoding = "utf-8"
+            lines = response.iter_lines(decode_unicode=True)
+            for line in lines:
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    # Read to the end of the body, or closing the response drops the connection
+                    # instead of returning it to the pool
+                    for _ in lines:
+                        pass
+                    return
+                choices = json.loads(data).get("choices") or [{}]
+                delta = (choices[0].get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+
+    def stream(self, content):
+        yield from self.stream_prompt(build_analysis_prompt(content))
+
+    def analyze(self, content):
+        print(f"\nSending data to {self.model} at {self.base_url}...")
+        try:
+            return super().analyze(content)
+        except (requests.RequestException, ValueError) as e:
+            print(f"Error from the analysis API: {e}")
+            return f"Error from the analysis API: {e}"
+
+def create_analyzer(name, assistant=None, base_url=None, model=None, timeout=120):
+    """Return the analyzer called `name` (see ANALYZERS)"""
+    if name == "browser":
+        return BrowserChatAnalyzer(assistant)
+    if name == "api":
+        return HTTPChatAnalyzer(base_url=base_url, model=model, timeout=timeout)
+    raise ValueError(f"Unknown analyzer: {name}. Choose from: {', '.join(ANALYZERS)}")
@@ -0,0 +1,109 @@
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# A local stand-in for an OpenAI-compatible chat completions API, so the HTTP
+# analyzer can be exercised and benchmarked without a network or an API key
+
+DEFAULT_REPLY = ("The page describes the topic in some detail. Key points: the main claim is supported by "
+                 "several sources, the figures quoted are recent, and the article links to further reading. ") * 4
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like a real API
+    disable_nagle_algorithm = True  # each delta is its own small write; don't hold it back for an ACK
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/chat/completions":
+            self.send_error(404)
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        reply, chunk_size, delay = self.server.reply, self.server.chunk_size, self.server.delay
+
+        if self.server.status != 200:
+            body = json.dumps({"error": {"message": "stand-in error"}}).encode("utf-8")
+            self.send_response(self.server.status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        if not request.get("stream"):
+            body = json.dumps({"choices": [{"message": {"role": "assistant", "content": reply}}]}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for start in range(0, len(reply), chunk_size):
+            if delay:
+                time.sleep(delay)
+            chunk = {"choices": [{"delta": {"content": reply[start:start + chunk_size]}}]}
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+            if self.server.malformed:
+                self._write_chunk("data: {not json\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address):
+        super().__init__(address, StubHandler)
+        self.connections = 0  # accepted so far, so tests can check that clients keep them alive
+        self._connections_lock = threading.Lock()
+
+    def get_request(self):
+        request = super().get_request()
+        with self._connections_lock:
+            self.connections += 1
+        return request
+
+def start_stub_server(host="127.0.0.1", port=0, reply=DEFAULT_REPLY, chunk_size=16, delay=0, status=200,
+                      malformed=False):
+    """Serve the stand-in API on a background thread; returns the server and its base URL.
+    status answers every request with that error instead, and malformed sends a broken
+    event after the first delta. server.connections counts the connections accepted."""
+    server = StubServer((host, port))
+    server.reply = reply
+    server.chunk_size = chunk_size
+    server.delay = delay
+    server.status = status
+    server.malformed = malformed
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for an OpenAI-compatible chat completions API')
+    parser.add_argument('--port', type=int, default=8800, help='Port to listen on (default: 8800)')
+    parser.add_argument('--chunk-size', type=int, default=16, help='Characters per streamed delta (default: 16)')
+    parser.add_argument('--delay', type=float, default=0.02, metavar='SECONDS',
+                        help='Pause before each delta, to mimic generation speed (default: 0.02)')
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(port=args.port, chunk_size=args.chunk_size, delay=args.delay)
+    print(f"Stand-in API listening at {base_url} (use --analyzer api --api-base-url {base_url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import re
+from html_parsing import get_backend
+
+# Default number of characters of main content kept per page
+DEFAULT_BUDGET = 5000
+
+# Elements that never hold article text
+BOILERPLATE_TAGS = ["script", "style", "noscript", "nav", "footer", "header", "aside", "form", "iframe", "svg"]
+
+# Elements whose text is emitted as one block of the main content
+BLOCK_TAGS = frozenset(["p", "pre", "blockquote", "li", "td", "h1", "h2", "h3", "h4", "h5", "h6"])
+
+# Blocks shorter than this don't count towards a container's score
+MIN_BLOCK_CHARS = 25
+
+# class/id hints in the style of readability
+POSITIVE_HINTS = re.compile(r'article|body|content|entry|main|page|post|story|text', re.I)
+NEGATIVE_HINTS = re.compile(r'ad-|ads|banner|comment|combx|footer|menu|meta|nav|promo|related|share|'
+                            r'sidebar|social|sponsor|subscribe|widget', re.I)
+
+# Only the best few containers get the (more expensive) link density check
+CANDIDATES_CHECKED = 5
+
+# Scoring stops once this many budgets' worth of prose has been seen; by then
+# the container holding the main content has clearly pulled ahead
+SCORING_BUDGET_FACTOR = 4
+
+def _collapse(text):
+    # str.split() is several times faster than a \s+ regex on long paragraphs
+    return " ".join((text or "").split())
+
+def _class_weight(backend, element):
+    hints = " ".join(filter(None, (backend.attribute(element, "class"), backend.attribute(element, "id"))))
+    if not hints:
+        return 0
+    weight = 0
+    if POSITIVE_HINTS.search(hints):
+        weight += 25
+    if NEGATIVE_HINTS.search(hints):
+        weight -= 25
+    return weight
+
+def _link_density(backend, element, text_length):
+    if not text_length:
+        return 1
+    link_chars = 0
+    for link in backend.find_all(element, "a"):
+        link_chars += len(backend.text(link).strip())
+        if link_chars >= text_length:
+            return 1  # All links already; no need to look further
+    return link_chars / text_length
+
+def _prose_lengths(backend, blocks, keys):
+    """Sum the lengths of the scored blocks inside each of the containers in keys"""
+    lengths = dict.fromkeys(keys, 0)
+    for element, length in blocks:
+        ancestor = backend.parent(element)
+        while ancestor is not None:
+            key = backend.key(ancestor)
+            if key in lengths:
+                lengths[key] += length
+            ancestor = backend.parent(ancestor)
+    return lengths
+
+def _best_container(backend, root, budget=DEFAULT_BUDGET):
+    """Score the parents of text blocks and return the container holding the main content"""
+    scores = {}  # element key -> [element, score]
+    blocks = []  # (element, text length) of every block scored
+    seen = 0
+
+    def add(element, score):
+        if element is None:
+            return
+        key = backend.key(element)
+        if key not in scores:
+            scores[key] = [element, _class_weight(backend, element)]
+        scores[key][1] += score
+
+    for element in backend.iter_descendants(root):
+        if backend.describe(element)[0] not in ("p", "pre", "td", "blockquote"):
+            continue
+        # Raw lengths are close enough for scoring and skip a whitespace pass per block
+        text = backend.text(element).strip()
+        if len(text) < MIN_BLOCK_CHARS:
+            continue
+        # Longer, comma-rich paragraphs are more likely to be prose than chrome
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        parent = backend.parent(element)
+        add(parent, score)
+        if parent is not None:
+            add(backend.parent(parent), score / 2)
+        blocks.append((element, len(text)))
+        seen += len(text)
+        if budget and seen >= SCORING_BUDGET_FACTOR * budget:
+            break
+
+    if not scores:
+        return None
+
+    # Containers that are mostly links are menus, not articles. Link text is set
+    # against the prose measured while scoring, which the budget already caps,
+    # rather than against the text of the whole (possibly page-sized) container
+    candidates = sorted(scores.values(), key=lambda entry: entry[1], reverse=True)[:CANDIDATES_CHECKED]
+    prose = _prose_lengths(backend, blocks, [backend.key(element) for element, _ in candidates])
+    best, best_score = None, None
+    for element, score in candidates:
+        score *= 1 - _link_density(backend, element, prose[backend.key(element)])
+        if best_score is None or score > best_score:
+            best, best_score = element, score
+    return best
+
+def _inside_emitted(backend, element, container, emitted):
+    container_key = backend.key(container)
+    ancestor = backend.parent(element)
+    while ancestor is not None:
+        key = backend.key(ancestor)
+        if key == container_key:
+            return False
+        if key in emitted:
+            return True
+        ancestor = backend.parent(ancestor)
+    return False
+
+def extract_main_content(html, budget=DEFAULT_BUDGET, backend=None):
+    """Return the title and up to `budget` characters of a page's main content.
+
+    The result is a dict with title, text, and truncated (whether content was
+    left out to stay within the budget). Blocks are collected in document order
+    and traversal stops as soon as the budget is used up."""
+    backend = backend or get_backend()
+    root = backend.parse(html)
+    title = backend.title(root)
+    backend.remove(root, BOILERPLATE_TAGS)
+
+    container = _best_container(backend, root, budget)
+    if container is None:
+        # No prose blocks at all; fall back to the page's visible text
+        text = "\n".join(filter(None, (_collapse(line) for line in backend.get_text(root).splitlines())))
+        truncated = bool(budget) and len(text) > budget
+        return {"title": title, "text": text[:budget] if truncated else text, "truncated": truncated}
+
+    blocks = []
+    used = 0
+    truncated = False
+    emitted = set()
+    for element in backend.iter_descendants(container):
+        if backend.describe(element)[0] not in BLOCK_TAGS:
+            continue
+        # A block nested at any depth in one that was already emitted (a <p> inside an <li>) is already covered
+        if _inside_emitted(backend, element, container, emitted):
+            continue
+        emitted.add(backend.key(element))
+        text = _collapse(backend.text(element))
+        if not text:
+            continue
+        if budget and used + len(text) > budget:
+            if budget > used:
+                blocks.append(text[:budget - used])
+            truncated = True
+            break
+        blocks.append(text)
+        used += len(text) + 1
+
+    return {"title": title, "text": "\n".join(blocks), "truncated": truncated}
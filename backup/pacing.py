@@ -0,0 +1,90 @@
+import time
+import random
+
+# Artificial delays, in seconds, that make the assistant look like a person.
+# Waiting for pages is handled by the readiness checks below in every profile;
+# these only cover the pauses a human would take.
+#   human - random pauses, per-character typing and reading-style scrolling
+#   fast  - no artificial delays at all, for internal and intranet sites
+PACING_PROFILES = {
+    "human": {
+        "typing": True,
+        "scrolling": True,
+        "delays": {
+            "after_click": (0.5, 1.0),
+            "before_submit": (0.5, 1.2),
+            "after_scroll": (0.5, 1.5),
+            "before_extract": (1.5, 2.5),
+            "before_send": (0.8, 1.5),
+            "notice": (3, 3),
+        },
+    },
+    "fast": {
+        "typing": False,
+        "scrolling": False,
+        "delays": {},
+    },
+}
+
+PACING_NAMES = list(PACING_PROFILES)
+
+# Resolves once no new network requests have started for idleMs, or after
+# timeoutMs; resource timing entries stand in for CDP network events, which
+# Selenium can only send commands for, not listen to
+NETWORK_IDLE_SCRIPT = """
+const idleMs = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+let idleTimer = null, observer = null;
+const finish = (idle) => {
+    if (observer) observer.disconnect();
+    clearTimeout(idleTimer);
+    clearTimeout(hardTimer);
+    done(idle);
+};
+const armIdleTimer = () => {
+    clearTimeout(idleTimer);
+    idleTimer = setTimeout(() => finish(true), idleMs);
+};
+const hardTimer = setTimeout(() => finish(false), timeoutMs);
+observer = new PerformanceObserver(armIdleTimer);
+observer.observe({type: 'resource', buffered: false});
+armIdleTimer();
+"""
+
+class Pacing:
+    """Applies a pacing profile's artificial delays"""
+
+    def __init__(self, profile="human"):
+        if profile not in PACING_PROFILES:
+            raise ValueError(f"Unknown pacing profile: {profile}. Choose from: {', '.join(PACING_NAMES)}")
+        self.profile = profile
+        self.typing = PACING_PROFILES[profile]["typing"]
+        self.scrolling = PACING_PROFILES[profile]["scrolling"]
+        self.delays = PACING_PROFILES[profile]["delays"]
+
+    def pause(self, name):
+        """Sleep for the profile's delay called `name`, if it has one"""
+        low, high = self.delays.get(name, (0, 0))
+        if high > 0:
+            time.sleep(random.uniform(low, high))
+
+def wait_for_document_ready(driver, timeout=20):
+    """Wait until the current document has finished loading"""
+    from selenium.webdriver.support.ui import WebDriverWait
+    WebDriverWait(driver, timeout).until(
+        lambda d: d.execute_script("return document.readyState") == "complete"
+    )
+
+def wait_for_network_idle(driver, idle_time=0.5, timeout=10):
+    """Wait until the page has stopped starting new requests; returns False if it never went quiet"""
+    driver.set_script_timeout(timeout + 5)
+    try:
+        return driver.execute_async_script(NETWORK_IDLE_SCRIPT, int(idle_time * 1000), int(timeout * 1000))
+    except Exception:
+        # Pages without PerformanceObserver support just count as loaded
+        return False
+
+def wait_for_new_tab(driver, known_tabs, timeout=10):
+    """Wait for a tab that isn't in known_tabs to appear and return its handle"""
+    from selenium.webdriver.support.ui import WebDriverWait
+    WebDriverWait(driver, timeout).until(lambda d: set(d.window_handles) - set(known_tabs))
+    return next(iter(set(driver.window_handles) - set(known_tabs)))
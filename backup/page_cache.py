@@ -0,0 +1,148 @@
+import os
+import time
+import sqlite3
+import threading
+import urllib.parse
+
+# Entries younger than this are served without contacting the site at all;
+# older ones are revalidated with a conditional GET when they carry validators
+DEFAULT_TTL = 6 * 60 * 60
+
+# Least recently used pages are evicted once the stored text exceeds this many bytes
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'browser-automation', 'page_cache.sqlite3')
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMETERS = ("utm_", "gclid", "fbclid", "mc_cid", "mc_eid", "ref_src")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS page_cache (
+    url TEXT PRIMARY KEY,
+    title TEXT,
+    text TEXT NOT NULL,
+    truncated INTEGER NOT NULL,
+    budget INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    size INTEGER NOT NULL,
+    fetched REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS page_cache_accessed ON page_cache (accessed);
+"""
+
+def normalize_url(url):
+    """Lower-case the scheme and host, drop the fragment and tracking parameters, and sort the query"""
+    parts = urllib.parse.urlsplit(url.strip())
+    query = sorted(
+        (name, value) for name, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith(TRACKING_PARAMETERS)
+    )
+    netloc = parts.netloc.lower()
+    if parts.scheme == "https" and netloc.endswith(":443") or parts.scheme == "http" and netloc.endswith(":80"):
+        netloc = netloc.rsplit(":", 1)[0]
+    return urllib.parse.urlunsplit((parts.scheme.lower(), netloc, parts.path or "/",
+                                    urllib.parse.urlencode(query), ""))
+
+class PageCache:
+    """Extracted page content kept in SQLite with the validators needed to revalidate it"""
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or os.environ.get("PAGE_CACHE_PATH") or DEFAULT_CACHE_PATH
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Shared with fetch_many's HTTP workers and the pipeline's threads; the lock keeps their transactions apart
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.executescript(SCHEMA)
+
+    def get(self, url, budget):
+        """Return the cached page for url, or None if there is none that covers `budget`.
+
+        The returned dict has title, text, truncated, etag and last_modified, plus
+        fresh, which is False once the entry is older than the TTL and has to be
+        revalidated before it is used."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT title, text, truncated, budget, etag, last_modified, fetched FROM page_cache WHERE url = ?",
+                (normalize_url(url),)
+            ).fetchone()
+            if row is None:
+                return None
+
+            title, text, truncated, stored_budget, etag, last_modified, fetched = row
+            # Text cut to a smaller budget can't serve a request for more
+            if truncated and (not budget or budget > stored_budget):
+                return None
+            if budget and len(text) > budget:
+                text, truncated = text[:budget], True
+
+            fresh = time.time() - fetched <= self.ttl
+            if not fresh and not (etag or last_modified):
+                # Nothing to revalidate with, so the entry is just expired
+                return None
+
+            with self._db:
+                self._db.execute("UPDATE page_cache SET accessed = ? WHERE url = ?", (time.time(), normalize_url(url)))
+            return {
+                "title": title,
+                "text": text,
+                "truncated": bool(truncated),
+                "etag": etag,
+                "last_modified": last_modified,
+                "fresh": fresh,
+            }
+
+    def put(self, url, page, budget, etag=None, last_modified=None):
+        """Store an extracted page and evict the least recently used pages over the size cap"""
+        now = time.time()
+        size = len(page["text"].encode("utf-8")) + len((page["title"] or "").encode("utf-8"))
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO page_cache "
+                "(url, title, text, truncated, budget, etag, last_modified, size, fetched, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (normalize_url(url), page["title"], page["text"], int(page["truncated"]), budget or 0,
+                 etag, last_modified, size, now, now)
+            )
+            self._evict()
+
+    def touch(self, url):
+        """Mark a page as just revalidated (the site answered 304 Not Modified)"""
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute("UPDATE page_cache SET fetched = ?, accessed = ? WHERE url = ?",
+                             (now, now, normalize_url(url)))
+
+    def _evict(self):
+        # Called from put() with the lock held
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM page_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._db.execute("SELECT url, size FROM page_cache ORDER BY accessed").fetchall():
+            self._db.execute("DELETE FROM page_cache WHERE url = ?", (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM page_cache")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+def open_page_cache(enabled=True, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+    """Open the shared page content cache, or return None if it is disabled or can't be opened"""
+    if not enabled:
+        return None
+    try:
+        return PageCache(ttl=ttl, max_bytes=max_bytes)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Page content cache unavailable ({e}). Continuing without it.")
+        return None
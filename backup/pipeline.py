@@ -0,0 +1,150 @@
+import time
+import asyncio
+
+# Items waiting between two stages; a full queue holds the stage before it back
+DEFAULT_QUEUE_SIZE = 4
+
+class StageMetrics:
+    """Counters for one pipeline stage and the queue feeding it"""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.failed = 0
+        self.busy = 0.0
+        self.max_depth = 0
+        self._depth_total = 0
+        self._depth_samples = 0
+
+    def sample(self, queue):
+        depth = queue.qsize()
+        self.max_depth = max(self.max_depth, depth)
+        self._depth_total += depth
+        self._depth_samples += 1
+
+    @property
+    def mean_depth(self):
+        return self._depth_total / self._depth_samples if self._depth_samples else 0
+
+    def as_dict(self, elapsed):
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "processed": self.processed,
+            "failed": self.failed,
+            "busy_s": round(self.busy, 2),
+            # Share of the run the stage's workers spent working
+            "utilization": round(self.busy / (elapsed * self.workers), 2) if elapsed else 0,
+            "max_queue": self.max_depth,
+            "mean_queue": round(self.mean_depth, 2),
+        }
+
+async def _worker(metrics, inbox, outbox, work):
+    """Take items from inbox, run the blocking `work` on a thread, and pass results on"""
+    while True:
+        item = await inbox.get()
+        metrics.sample(inbox)
+        started = time.perf_counter()
+        try:
+            result = await asyncio.to_thread(work, item)
+        except Exception as e:
+            metrics.failed += 1
+            print(f"\n[{metrics.name}] {item.get('query')}: {e}")
+            inbox.task_done()
+            continue
+        finally:
+            metrics.busy += time.perf_counter() - started
+        # The item only counts as done once it is handed on, so the next stage's
+        # queue can't be drained while a result is still waiting to be put into it
+        metrics.processed += 1
+        try:
+            if outbox is not None:
+                await outbox.put(result)
+        finally:
+            inbox.task_done()
+
+async def _report(stages, queues, interval):
+    while True:
+        await asyncio.sleep(interval)
+        depths = ", ".join(f"{stage.name} {queue.qsize()}" for stage, queue in zip(stages, queues))
+        done = ", ".join(f"{stage.name} {stage.processed}" for stage in stages)
+        print(f"\n[pipeline] queued: {depths} | done: {done}")
+
+async def run_pipeline(assistant, analyzer, queries, get_content, search_workers=1, fetch_workers=2,
+                       analyze_workers=2, queue_size=DEFAULT_QUEUE_SIZE, on_result=None, report_interval=None):
+    """Search, fetch and analyze every query with all three stages running at once.
+
+    get_content turns a query's search results into the content dict to analyze
+    (see ai_search_assistant.get_sources_content).
+
+    Each stage has its own worker count, and bounded queues sit between the
+    stages so a fast stage can't run far ahead of a slow one. Stages that need
+    the browser take turns on it (AISearchAssistant.browser_lock); HTTP fetches,
+    cache hits and API analysis overlap freely. Returns (results, metrics), where
+    each result has query, url, analysis and follow_up, and metrics has one dict
+    per stage."""
+    stages = [StageMetrics("search", search_workers), StageMetrics("fetch", fetch_workers),
+              StageMetrics("analyze", analyze_workers)]
+    queues = [asyncio.Queue(maxsize=queue_size) for _ in stages]
+    results = []
+
+    def search(item):
+        search_results = assistant.search_google(item["query"])
+        if not search_results:
+            raise Exception("no search results")
+        return {**item, "results": search_results}
+
+    def fetch(item):
+        return {**item, "content": get_content(item["results"])}
+
+    def analyze(item):
+        # Collected quietly so parallel analyses don't interleave on the terminal
+        analysis = "".join(analyzer.stream(item["content"]))
+        if not analysis:
+            raise Exception("empty analysis")
+        result = {
+            "query": item["query"],
+            "url": item["content"]["url"],
+            "analysis": analysis,
+            "follow_up": assistant.follow_up_search(analysis),
+        }
+        results.append(result)
+        if on_result:
+            on_result(result)
+        return result
+
+    workers = []
+    for metrics, inbox, outbox, work in zip(stages, queues, queues[1:] + [None], [search, fetch, analyze]):
+        workers.append([asyncio.create_task(_worker(metrics, inbox, outbox, work)) for _ in range(metrics.workers)])
+    reporter = asyncio.create_task(_report(stages, queues, report_interval)) if report_interval else None
+
+    started = time.perf_counter()
+    # Read on a thread, so queries streamed from stdin (--pipeline -) don't block the event loop
+    queries = iter(queries)
+    end = object()
+    while True:
+        query = await asyncio.to_thread(next, queries, end)
+        if query is end:
+            break
+        await queues[0].put({"query": query})
+        stages[0].sample(queues[0])
+
+    # Each stage is finished once its queue is drained and the stage before it has stopped feeding it
+    for queue, stage_workers in zip(queues, workers):
+        await queue.join()
+        for task in stage_workers:
+            task.cancel()
+        await asyncio.gather(*stage_workers, return_exceptions=True)
+    if reporter:
+        reporter.cancel()
+
+    elapsed = time.perf_counter() - started
+    return results, [stage.as_dict(elapsed) for stage in stages]
+
+def print_metrics(metrics):
+    print(f"\n{'stage':<8} {'workers':>7} {'done':>5} {'failed':>6} {'busy s':>8} {'util':>5} "
+          f"{'max queue':>9} {'mean queue':>10}")
+    for row in metrics:
+        print(f"{row['stage']:<8} {row['workers']:>7} {row['processed']:>5} {row['failed']:>6} {row['busy_s']:>8.2f} "
+              f"{row['utilization']:>5.2f} {row['max_queue']:>9} {row['mean_queue']:>10.2f}")
@@ -0,0 +1,120 @@
+import re
+
+# Characters of packed source text per prompt (roughly 4 characters per token)
+DEFAULT_PROMPT_BUDGET = 12000
+
+# Appended by AISearchAssistant when a page was cut to its content budget
+TRUNCATION_NOTE = "... [Text truncated due to length]"
+
+# Paragraphs are compared as sets of this many consecutive words
+SHINGLE_SIZE = 5
+
+# Paragraphs sharing at least this fraction of their shingles are near-duplicates
+SIMILARITY_THRESHOLD = 0.7
+
+_WORD = re.compile(r'\w+')
+
+def _normalize(line):
+    return " ".join(_WORD.findall(line.casefold()))
+
+def _shingles(words, size=SHINGLE_SIZE):
+    return {hash(tuple(words[i:i + size])) for i in range(len(words) - size + 1)}
+
+class _DuplicateFilter:
+    """Remembers kept paragraphs and recognises exact and near-duplicate repeats"""
+
+    def __init__(self, shingle_size=SHINGLE_SIZE, threshold=SIMILARITY_THRESHOLD):
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.lines = set()
+        self.shingle_sets = []
+        self.index = {}  # shingle -> indexes into shingle_sets
+
+    def is_duplicate(self, paragraph):
+        normalized = _normalize(paragraph)
+        if not normalized or normalized in self.lines:
+            return True
+        words = normalized.split()
+        shingles = _shingles(words, self.shingle_size) if len(words) >= self.shingle_size else set()
+
+        # Only paragraphs sharing a shingle can be similar, so the index keeps this linear
+        overlaps = {}
+        for shingle in shingles:
+            for other in self.index.get(shingle, ()):
+                overlaps[other] = overlaps.get(other, 0) + 1
+        for other, shared in overlaps.items():
+            union = len(shingles) + len(self.shingle_sets[other]) - shared
+            if shared / union >= self.threshold:
+                return True
+
+        self.lines.add(normalized)
+        if shingles:
+            for shingle in shingles:
+                self.index.setdefault(shingle, []).append(len(self.shingle_sets))
+            self.shingle_sets.append(shingles)
+        return False
+
+def _allocate(lengths, budget):
+    """Split budget across documents: short ones take what they need, the rest share what is left"""
+    allowances = [0] * len(lengths)
+    remaining = budget
+    pending = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    while pending:
+        share = remaining // len(pending)
+        index = pending.pop(0)
+        allowances[index] = min(lengths[index], share)
+        remaining -= allowances[index]
+    return allowances
+
+def pack_documents(contents, budget=DEFAULT_PROMPT_BUDGET, shingle_size=SHINGLE_SIZE,
+                   threshold=SIMILARITY_THRESHOLD):
+    """Pack several page contents (title, text, url) into one content dict for a single prompt.
+
+    Repeated lines and near-duplicate paragraphs are dropped across all documents
+    (earlier documents win), then the remaining text is fitted into `budget`
+    characters, with documents that need less than an even share leaving the rest
+    to the others. The result also has sources (the number of documents packed)
+    and dropped (the number of duplicate paragraphs removed)."""
+    duplicates = _DuplicateFilter(shingle_size, threshold)
+    documents = []
+    dropped = 0
+    for content in contents:
+        text = content["text"]
+        if text.endswith(TRUNCATION_NOTE):
+            text = text[:-len(TRUNCATION_NOTE)]
+        kept = []
+        for paragraph in text.splitlines():
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if duplicates.is_duplicate(paragraph):
+                dropped += 1
+            else:
+                kept.append(paragraph)
+        documents.append((content, kept))
+
+    headers = [f"[Source {i}: {content['title']} ({content['url']})]" for i, (content, _) in enumerate(documents, 1)]
+    overhead = sum(len(header) + 3 for header in headers)  # header newline plus the blank line between sources
+    lengths = [sum(len(paragraph) + 1 for paragraph in kept) for _, kept in documents]
+    allowances = _allocate(lengths, max(0, budget - overhead)) if budget else lengths
+
+    sections = []
+    for header, (_, kept), allowance in zip(headers, documents, allowances):
+        lines = []
+        used = 0
+        for paragraph in kept:
+            if used + len(paragraph) + 1 > allowance:
+                if allowance - used > 1:
+                    lines.append(paragraph[:allowance - used - 1])
+                break
+            lines.append(paragraph)
+            used += len(paragraph) + 1
+        sections.append(header + "\n" + "\n".join(lines))
+
+    return {
+        "title": " | ".join(content["title"] for content, _ in documents),
+        "text": "\n\n".join(sections),
+        "url": ", ".join(content["url"] for content, _ in documents),
+        "sources": len(documents),
+        "dropped": dropped,
+    }
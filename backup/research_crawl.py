@@ -0,0 +1,129 @@
+import json
+import math
+import time
+import heapq
+import hashlib
+from serp_cache import normalize_query
+from page_cache import normalize_url
+
+# Visited sets expected to grow past this many entries use a Bloom filter instead of a set
+BLOOM_THRESHOLD = 100000
+
+# False positive rate of the Bloom filter; a false positive only skips an unvisited item
+BLOOM_ERROR_RATE = 0.001
+
+class BloomFilter:
+    """Fixed-size set membership with no false negatives and a small false positive rate"""
+
+    def __init__(self, capacity, error_rate=BLOOM_ERROR_RATE):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        # Double hashing: two 64-bit halves of one digest stand in for k hash functions
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+def visited_set(expected):
+    """A plain set for ordinary runs, a Bloom filter when `expected` entries wouldn't fit comfortably"""
+    return BloomFilter(expected) if expected > BLOOM_THRESHOLD else set()
+
+class Frontier:
+    """Queries and URLs waiting to be visited, shallowest and best-ranked first, each at most once"""
+
+    def __init__(self, expected=1000):
+        self._heap = []
+        self._order = 0
+        self.seen = visited_set(expected)
+
+    def push(self, kind, value, depth, rank=0):
+        key = f"q:{normalize_query(value)}" if kind == "query" else f"u:{normalize_url(value)}"
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        # Searches come before the pages found at the same depth, then by result rank
+        heapq.heappush(self._heap, (depth, 0 if kind == "query" else 1, rank, self._order, kind, value))
+        self._order += 1
+        return True
+
+    def pop(self):
+        depth, _, rank, _, kind, value = heapq.heappop(self._heap)
+        return kind, value, depth, rank
+
+    def __len__(self):
+        return len(self._heap)
+
+def research(assistant, analyzer, seed_query, depth=2, breadth=3, max_pages=50, time_budget=None,
+             output_path=None):
+    """Crawl outward from seed_query without asking anything: search, read and analyze the top
+    `breadth` results, then search each analysis's follow-up query, down to `depth` levels.
+
+    Stops when the frontier is empty, after max_pages pages, or once time_budget
+    seconds have passed. Every analysed page is returned as a dict (query, url,
+    depth, analysis, follow_up) and, with output_path, appended to that file as a
+    JSON line as soon as it is done, so a long run can be followed or resumed by hand."""
+    frontier = Frontier(expected=max_pages * (breadth + 1))
+    frontier.push("query", seed_query, 0)
+    started = time.time()
+    findings = []
+    pages = 0
+    queries_for = {}  # url -> the query that found it
+    output = open(output_path, "a", encoding="utf-8") if output_path else None
+
+    try:
+        while frontier:
+            if pages >= max_pages:
+                print(f"\nPage budget of {max_pages} reached.")
+                break
+            if time_budget and time.time() - started > time_budget:
+                print(f"\nTime budget of {time_budget:.0f}s reached.")
+                break
+
+            kind, value, level, _ = frontier.pop()
+            try:
+                if kind == "query":
+                    results = assistant.search_google(value) or []
+                    for rank, result in enumerate(results[:breadth]):
+                        if frontier.push("url", result["link"], level, rank):
+                            queries_for[result["link"]] = value
+                    continue
+
+                content = assistant.get_page_content(value)
+                pages += 1
+                analysis = "".join(analyzer.stream(content))
+                follow_up = assistant.follow_up_search(analysis) if analysis else None
+            except Exception as e:
+                print(f"\nSkipping {kind} {value}: {e}")
+                continue
+
+            finding = {
+                "query": queries_for.get(value),
+                "url": value,
+                "depth": level,
+                "analysis": analysis,
+                "follow_up": follow_up,
+            }
+            findings.append(finding)
+            print(f"\n[{pages}/{max_pages}, depth {level}] {content['title']} ({value})")
+            if output:
+                output.write(json.dumps(finding) + "\n")
+                output.flush()
+
+            if follow_up and level + 1 <= depth:
+                frontier.push("query", follow_up, level + 1)
+    finally:
+        if output:
+            output.close()
+
+    print(f"\nResearch finished: {pages} pages analysed in {time.time() - started:.0f}s, "
+          f"{len(frontier)} items left in the frontier.")
+    return findings
@@ -0,0 +1,119 @@
+import time
+
+# Elements a chat UI renders its replies into, newest last
+RESPONSE_SELECTORS = [
+    "div.markdown-body",
+    "div.message-content",
+    "div.assistant-message",
+    "div.response-content",
+]
+
+# Shown only while a reply is being generated
+STOP_SELECTORS = [
+    "button[aria-label*='Stop' i]",
+    "button[title*='Stop' i]",
+    "div[class*='stop-button']",
+]
+
+# Appear under a reply once it is finished
+DONE_SELECTORS = [
+    "button[aria-label*='Regenerate' i]",
+    "button[title*='Regenerate' i]",
+    "div[class*='regenerate']",
+]
+
+# Seconds without any change after which a reply counts as finished when the
+# page shows no stop/regenerate state to go by
+STABLE_TIME = 3.0
+
+# Installed right before the message is sent: replies already on the page are
+# counted so the watcher only follows the new one, and a MutationObserver keeps
+# its text in window.__responseWatch for the poll script to pick up
+WATCH_SCRIPT = """
+const responseSelector = arguments[0], stopSelector = arguments[1], doneSelector = arguments[2];
+if (window.__responseWatch) window.__responseWatch.observer.disconnect();
+const baseline = document.querySelectorAll(responseSelector).length;
+const doneBaseline = doneSelector ? document.querySelectorAll(doneSelector).length : 0;
+const watch = window.__responseWatch = {text: '', changed: Date.now(), sawStop: false, done: false};
+let scheduled = false;
+const update = () => {
+    scheduled = false;
+    const replies = document.querySelectorAll(responseSelector);
+    if (replies.length > baseline) {
+        const text = replies[replies.length - 1].innerText || '';
+        if (text !== watch.text) {
+            watch.text = text;
+            watch.changed = Date.now();
+        }
+    }
+    if (stopSelector && document.querySelector(stopSelector)) {
+        watch.sawStop = true;
+    } else if (watch.sawStop && watch.text) {
+        watch.done = true;
+    }
+    if (doneSelector && watch.text && document.querySelectorAll(doneSelector).length > doneBaseline) {
+        watch.done = true;
+    }
+};
+// Streaming replies mutate the page many times per frame; reading innerText
+// forces layout, so batch the reads
+watch.observer = new MutationObserver(() => {
+    if (!scheduled) {
+        scheduled = true;
+        setTimeout(update, 50);
+    }
+});
+watch.observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+"""
+
+POLL_SCRIPT = """
+const watch = window.__responseWatch;
+if (!watch) return null;
+return [watch.text, Date.now() - watch.changed, watch.sawStop && !watch.done, watch.done];
+"""
+
+STOP_WATCH_SCRIPT = """
+if (window.__responseWatch) {
+    window.__responseWatch.observer.disconnect();
+    delete window.__responseWatch;
+}
+"""
+
+def watch_for_response(driver, response_selectors=RESPONSE_SELECTORS, stop_selectors=STOP_SELECTORS,
+                       done_selectors=DONE_SELECTORS):
+    """Start following the next reply on the page; call this before sending the message"""
+    driver.execute_script(WATCH_SCRIPT, ", ".join(response_selectors), ", ".join(stop_selectors),
+                          ", ".join(done_selectors))
+
+def stream_response(driver, stable_time=STABLE_TIME, timeout=180, poll_interval=0.2):
+    """Yield the reply's text as it arrives, one delta at a time.
+
+    The reply is complete when the page drops its stop button or shows a
+    regenerate button, or, on pages without either, when the text hasn't changed
+    for stable_time seconds. Only appended text is yielded; if the page rewrites
+    earlier text while rendering, the deltas follow the new text from the length
+    already sent. Raises TimeoutError if nothing arrives within timeout."""
+    sent = 0
+    started = time.time()
+    try:
+        while True:
+            state = driver.execute_script(POLL_SCRIPT)
+            if state is None:
+                raise RuntimeError("The page navigated away before the response finished")
+            text, quiet_ms, generating, done = state
+            if len(text) > sent:
+                yield text[sent:]
+                sent = len(text)
+            if text and (done or (not generating and quiet_ms >= stable_time * 1000)):
+                return
+            if time.time() - started > timeout:
+                if not text:
+                    raise TimeoutError(f"No response within {timeout} seconds")
+                print(f"\nResponse still changing after {timeout} seconds; using what has arrived so far.")
+                return
+            time.sleep(poll_interval)
+    finally:
+        try:
+            driver.execute_script(STOP_WATCH_SCRIPT)
+        except Exception:
+            pass
@@ -0,0 +1,54 @@
+import json
+import re
+
+# Output formats understood by format_results
+FORMATS = ["text", "jsonl", "markdown", "compact"]
+
+def _collapse(value):
+    """Squash runs of whitespace so a field fits on one line"""
+    return re.sub(r'\s+', ' ', value or '').strip()
+
+def _format_text(query, results):
+    yield f"Google Search Results for: {query}\n\n"
+    for i, result in enumerate(results, 1):
+        yield (
+            f"Result {i}:\n"
+            f"Title: {result['title']}\n"
+            f"Link: {result['link']}\n"
+            f"Snippet: {result['snippet']}\n\n"
+        )
+
+def _format_jsonl(query, results):
+    for i, result in enumerate(results, 1):
+        record = {"query": query, "rank": i, "title": result["title"], "link": result["link"], "snippet": result["snippet"]}
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+def _format_markdown(query, results):
+    yield f"# Google Search Results for: {query}\n\n"
+    for i, result in enumerate(results, 1):
+        yield f"{i}. [{_collapse(result['title'])}]({result['link']})\n   {_collapse(result['snippet'])}\n\n"
+
+def _format_compact(query, results):
+    # One line per result with no labels, which keeps the prompt short for an LLM
+    yield f"Q: {query}\n"
+    for i, result in enumerate(results, 1):
+        yield f"{i}|{_collapse(result['title'])}|{result['link']}|{_collapse(result['snippet'])}\n"
+
+_FORMATTERS = {
+    "text": _format_text,
+    "jsonl": _format_jsonl,
+    "markdown": _format_markdown,
+    "compact": _format_compact,
+}
+
+def format_results(query, results, output_format="text"):
+    """Yield the formatted header and then one formatted record per result, as results arrive"""
+    if output_format not in _FORMATTERS:
+        raise ValueError(f"Unknown output format: {output_format}. Choose from: {', '.join(FORMATS)}")
+    return _FORMATTERS[output_format](query, results)
+
+def write_results(query, results, stream, output_format="text"):
+    """Write formatted results to a stream record by record so nothing is held back in memory"""
+    for chunk in format_results(query, results, output_format):
+        stream.write(chunk)
+        stream.flush()
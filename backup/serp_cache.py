@@ -0,0 +1,110 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+import unicodedata
+
+# One day; search results for the same query rarely change faster than that
+DEFAULT_TTL = 24 * 60 * 60
+
+# Least recently used entries are evicted beyond this many cached queries
+DEFAULT_MAX_ENTRIES = 5000
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'browser-automation', 'serp_cache.sqlite3')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS serp_cache (
+    key TEXT PRIMARY KEY,
+    results TEXT NOT NULL,
+    result_limit INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS serp_cache_accessed ON serp_cache (accessed);
+"""
+
+def normalize_query(query):
+    """Fold case, Unicode forms and whitespace so trivially different spellings share an entry"""
+    query = unicodedata.normalize('NFKC', query).casefold()
+    return re.sub(r'\s+', ' ', query).strip()
+
+class SerpCache:
+    """Extracted result lists kept in SQLite, keyed by normalized query, engine and locale"""
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path or os.environ.get("SERP_CACHE_PATH") or DEFAULT_CACHE_PATH
+        self.ttl = ttl
+        self.max_entries = max_entries
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # One connection shared by the pipeline's worker threads; the lock keeps their transactions apart
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._db.executescript(SCHEMA)
+
+    @staticmethod
+    def make_key(query, engine="google", locale=""):
+        return f"{engine}\x1f{locale or ''}\x1f{normalize_query(query)}"
+
+    def get(self, query, max_results=None, engine="google", locale=""):
+        """Return the cached results for a query, or None if missing, expired or too short"""
+        key = self.make_key(query, engine, locale)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT results, result_limit, created FROM serp_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            results, result_limit, created = row
+            now = time.time()
+            if now - created > self.ttl:
+                with self._db:
+                    self._db.execute("DELETE FROM serp_cache WHERE key = ?", (key,))
+                return None
+
+            # An entry stored with a smaller limit can't answer a request for more results
+            if result_limit and (not max_results or max_results > result_limit):
+                return None
+
+            with self._db:
+                self._db.execute("UPDATE serp_cache SET accessed = ? WHERE key = ?", (now, key))
+            results = json.loads(results)
+            return results[:max_results] if max_results else results
+
+    def put(self, query, results, max_results=None, engine="google", locale=""):
+        """Store the results for a query and evict the least recently used entries over the cap"""
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO serp_cache (key, results, result_limit, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.make_key(query, engine, locale), json.dumps(results, ensure_ascii=False),
+                 max_results or 0, now, now)
+            )
+            self._db.execute(
+                "DELETE FROM serp_cache WHERE key IN ("
+                "SELECT key FROM serp_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM serp_cache")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+def open_cache(enabled=True, ttl=DEFAULT_TTL):
+    """Open the shared result cache, or return None if it is disabled or can't be opened"""
+    if not enabled:
+        return None
+    try:
+        return SerpCache(ttl=ttl)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Search result cache unavailable ({e}). Continuing without it.")
+        return None
@@ -0,0 +1,102 @@
+import json
+import urllib.parse
+from html_parsing import SelectorCascade, get_backend
+
+# Result container selectors, tried in order until one matches
+RESULT_SELECTORS = ["div.g", "div.tF2Cxc", "div.yuRUbf"]
+
+# Snippet selectors, tried in order inside each result container
+SNIPPET_SELECTORS = ["div.VwiC3b", "span.aCOpRe"]
+
+# Where relative result links are resolved when the page's own URL isn't known
+DEFAULT_BASE_URL = "https://www.google.com/"
+
+def resolve_link(href, base_url=DEFAULT_BASE_URL):
+    """Make a result link absolute and unwrap Google's /url?q=... click redirect,
+    so the HTTP and browser paths give the same URL for the same result"""
+    if not href:
+        return href
+    link = urllib.parse.urljoin(base_url or DEFAULT_BASE_URL, href)
+    parts = urllib.parse.urlsplit(link)
+    host = parts.hostname or ""
+    if parts.path == "/url" and host.startswith(("google.", "www.google.")):
+        query = urllib.parse.parse_qs(parts.query)
+        target = (query.get("q") or query.get("url") or [None])[0]
+        if target and target.startswith(("http://", "https://")):
+            return target
+    return link
+
+# Runs inside the page and returns every result as one compact JSON string,
+# so the whole extraction costs a single round trip to chromedriver
+EXTRACT_RESULTS_SCRIPT = """
+const containerSelectors = arguments[0], snippetSelectors = arguments[1], limit = arguments[2];
+let containers = [];
+for (const selector of containerSelectors) {
+    containers = document.querySelectorAll(selector);
+    if (containers.length) break;
+}
+const results = [];
+for (const container of containers) {
+    if (limit && results.length >= limit) break;
+    const title = container.querySelector('h3');
+    const link = container.querySelector('a[href]');
+    let snippet = null;
+    for (const selector of snippetSelectors) {
+        snippet = container.querySelector(selector);
+        if (snippet) break;
+    }
+    results.push([
+        title ? title.innerText : null,
+        link ? link.href : null,
+        snippet ? snippet.innerText : null
+    ]);
+}
+return JSON.stringify(results);
+"""
+
+def extract_search_results(driver, max_results=None):
+    """Extract title, link and snippet of every search result in one script call"""
+    payload = driver.execute_script(
+        EXTRACT_RESULTS_SCRIPT,
+        RESULT_SELECTORS,
+        SNIPPET_SELECTORS,
+        max_results or 0
+    )
+
+    # Missing fields come back as None so callers can decide how to handle them
+    return [
+        {"title": title, "link": resolve_link(link), "snippet": snippet}
+        for title, link, snippet in json.loads(payload or "[]")
+    ]
+
+# Cascades compiled once at import and reused for every page
+RESULT_CASCADE = SelectorCascade(RESULT_SELECTORS)
+TITLE_CASCADE = SelectorCascade(["h3"])
+LINK_CASCADE = SelectorCascade(["a[href]"])
+SNIPPET_CASCADE = SelectorCascade(SNIPPET_SELECTORS)
+
+def parse_search_results(page_source, max_results=None, backend=None, base_url=DEFAULT_BASE_URL):
+    """Parse search results out of raw page HTML (fallback when scripts can't run).
+    Links are resolved against base_url, the URL the page was served from."""
+    backend = backend or get_backend()
+    root = backend.parse(page_source)
+
+    # All container selectors are evaluated together in one walk over the tree
+    results = RESULT_CASCADE.select(backend, root)
+
+    search_results = []
+    for result in results:
+        if max_results and len(search_results) >= max_results:
+            break
+
+        title_elem = TITLE_CASCADE.select_one(backend, result)
+        link_elem = LINK_CASCADE.select_one(backend, result)
+        snippet_elem = SNIPPET_CASCADE.select_one(backend, result)
+
+        search_results.append({
+            "title": backend.text(title_elem) if title_elem is not None else None,
+            "link": resolve_link(backend.attribute(link_elem, 'href'), base_url) if link_elem is not None else None,
+            "snippet": backend.text(snippet_elem) if snippet_elem is not None else None
+        })
+
+    return search_results
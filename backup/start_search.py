@@ -4,21 +4,7 @@ import time
 import platform
 import subprocess
 import random
-import psutil
-
-def find_existing_chrome_debugging_port():
-    """Check if Chrome is already running with remote debugging enabled and get the port"""
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-        try:
-            cmdline = proc.info.get('cmdline', [])
-            if cmdline and any('chrome' in cmd.lower() for cmd in cmdline):
-                for cmd in cmdline:
-                    if '--remote-debugging-port=' in cmd:
-                        port = cmd.split('=')[1]
-                        return int(port)
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess, ValueError):
-            pass
-    return None
+from chrome_instances import find_existing_chrome_debugging_port, register, wait_for_debugging_port
 
 def start_chrome_with_debugging():
     """Start Chrome with remote debugging enabled"""
@@ -56,14 +42,12 @@ def start_chrome_with_debugging():
     command = [chrome_path, f"--remote-debugging-port={debugging_port}", "--no-first-run"]
     
     # Start Chrome in background
-    if system == "Windows":
-        from subprocess import DEVNULL
-        subprocess.Popen(command, stdout=DEVNULL, stderr=DEVNULL, shell=True)
-    else:
-        subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # No shell, so the pid recorded below is Chrome's own on every platform
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     
-    # Give Chrome a moment to start
-    time.sleep(3)
+    # Wait until Chrome answers on the port, and remember it so the next run finds it without a process scan
+    if wait_for_debugging_port(debugging_port):
+        register(debugging_port, process.pid)
     
     return debugging_port
 
@@ -0,0 +1,70 @@
+import time
+import random
+
+# Ways of getting a prompt into a chat input box:
+#   fast  - CDP Input.insertText, falling back to the JS setter if CDP isn't available
+#   cdp   - CDP Input.insertText only (fires the same beforeinput/input events as a paste)
+#   js    - native value setter / execCommand plus a synthetic input event
+#   keys  - send_keys in large chunks
+#   human - one send_keys per character with random delays
+INPUT_METHODS = ["fast", "cdp", "js", "keys", "human"]
+
+# Sets the whole value in one go through the native setter so frameworks like
+# React notice the change, then fires the events the page listens for
+SET_VALUE_SCRIPT = """
+const element = arguments[0], text = arguments[1];
+element.focus();
+if (element.isContentEditable) {
+    const selection = window.getSelection();
+    selection.selectAllChildren(element);
+    selection.collapseToEnd();
+    if (!document.execCommand('insertText', false, text)) {
+        element.textContent += text;
+        element.dispatchEvent(new InputEvent('input', {bubbles: true, inputType: 'insertText', data: text}));
+    }
+    return element.textContent.length;
+}
+const prototype = element instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+const setter = Object.getOwnPropertyDescriptor(prototype, 'value').set;
+setter.call(element, element.value + text);
+element.dispatchEvent(new InputEvent('input', {bubbles: true, inputType: 'insertText', data: text}));
+element.dispatchEvent(new Event('change', {bubbles: true}));
+return element.value.length;
+"""
+
+def human_like_typing(element, text):
+    """Type text with random delays like a human would"""
+    for char in text:
+        element.send_keys(char)
+        # Random delay between keystrokes (50-150ms)
+        time.sleep(random.uniform(0.05, 0.15))
+
+def insert_text_cdp(driver, element, text):
+    """Insert text at the caret of the focused element with a single CDP call"""
+    driver.execute_script("arguments[0].focus();", element)
+    driver.execute_cdp_cmd("Input.insertText", {"text": text})
+
+def insert_text_js(driver, element, text):
+    """Append text to an input, textarea or contenteditable element with a single script call"""
+    return driver.execute_script(SET_VALUE_SCRIPT, element, text)
+
+def insert_text(driver, element, text, method="fast", chunk_size=1000):
+    """Put text into an input element using the requested input method"""
+    if method == "fast":
+        try:
+            insert_text_cdp(driver, element, text)
+        except Exception as e:
+            # Remote or non-Chromium drivers don't expose CDP
+            print(f"CDP text insertion unavailable ({e}). Using the JavaScript setter instead.")
+            insert_text_js(driver, element, text)
+    elif method == "cdp":
+        insert_text_cdp(driver, element, text)
+    elif method == "js":
+        insert_text_js(driver, element, text)
+    elif method == "keys":
+        for i in range(0, len(text), chunk_size):
+            element.send_keys(text[i:i+chunk_size])
+    elif method == "human":
+        human_like_typing(element, text)
+    else:
+        raise ValueError(f"Unknown input method: {method}. Choose from: {', '.join(INPUT_METHODS)}")
@@ -0,0 +1,22 @@
+import re
+from collections import Counter
+
+# Words too common to say anything about a response
+COMMON_WORDS = ['the', 'a', 'an', 'in', 'on', 'at', 'to', 'for', 'and', 'or', 'but', 'is', 'are', 'was', 'were']
+
+def clean_page_text(text, max_length=5000):
+    """Strip blank lines and runs of spacing from extracted page text and trim it to max_length"""
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    text = '\n'.join(chunk for chunk in chunks if chunk)
+    
+    # Trim the text to a reasonable length
+    if max_length and len(text) > max_length:
+        text = text[:max_length] + "... [Text truncated due to length]"
+    return text
+
+def top_keywords(text, count=5, min_length=5):
+    """Return the most frequent words in text, skipping common and short words"""
+    words = re.findall(r'\b\w+\b', text.lower())
+    filtered_words = [word for word in words if word not in COMMON_WORDS and len(word) >= min_length]
+    return [word for word, _ in Counter(filtered_words).most_common(count)]
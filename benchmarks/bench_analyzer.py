@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+
+# The analyzers live in the backup directory alongside the scripts that use them
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backup"))
+from llm_backends import HTTPChatAnalyzer
+from llm_stub_server import start_stub_server
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def load_content():
+    with open(os.path.join(FIXTURES_DIR, "response.txt"), encoding="utf-8") as fixture:
+        return {"title": "Benchmark fixture", "text": fixture.read(), "url": "http://example.com/fixture"}
+
+def time_request(analyzer, content):
+    """Return (seconds to the first delta, seconds to the whole reply, characters received)"""
+    started = time.perf_counter()
+    first = None
+    received = 0
+    for delta in analyzer.stream(content):
+        if first is None:
+            first = time.perf_counter() - started
+        received += len(delta)
+    return first, time.perf_counter() - started, received
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the HTTP analyzer against a local stand-in API')
+    parser.add_argument('--requests', type=int, default=20, help='Requests to time (default: 20)')
+    parser.add_argument('--chunk-size', type=int, default=16, help='Characters per streamed delta (default: 16)')
+    parser.add_argument('--delay', type=float, default=0, metavar='SECONDS',
+                        help='Stand-in pause before each delta (default: 0, measures client overhead only)')
+    parser.add_argument('--base-url', default=None,
+                        help='Benchmark this endpoint instead of starting the stand-in server')
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server, base_url = start_stub_server(chunk_size=args.chunk_size, delay=args.delay)
+
+    analyzer = HTTPChatAnalyzer(base_url=base_url)
+    content = load_content()
+    try:
+        timings = [time_request(analyzer, content) for _ in range(args.requests)]
+    finally:
+        if server:
+            server.shutdown()
+
+    firsts = [first for first, _, _ in timings if first is not None]
+    totals = [total for _, total, _ in timings]
+    print(f"{args.requests} requests to {base_url}, {timings[0][2]} characters per reply")
+    print(f"first delta: median {statistics.median(firsts) * 1000:.2f} ms, best {min(firsts) * 1000:.2f} ms")
+    print(f"whole reply: median {statistics.median(totals) * 1000:.2f} ms, best {min(totals) * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import subprocess
+import tracemalloc
+
+# The extraction code lives in the backup directory alongside the scripts that use it
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backup"))
+from html_parsing import BACKENDS, extract_title_and_text, get_backend
+from serp_extraction import parse_search_results
+from text_processing import clean_page_text, top_keywords
+from main_content import extract_main_content
+from keyword_index import KeywordIndex
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def load_fixtures(prefix):
+    """Return (name, text) for every fixture whose file name starts with prefix, smallest first"""
+    fixtures = []
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.startswith(prefix):
+            with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as fixture:
+                fixtures.append((name, fixture.read()))
+    return sorted(fixtures, key=lambda fixture: len(fixture[1]))
+
+def available_backends(requested=None):
+    """Return the parser backends that can be imported here, optionally limited to `requested`"""
+    backends = []
+    for name in requested or BACKENDS:
+        try:
+            backends.append(get_backend(name))
+        except ImportError:
+            print(f"Skipping {name}: not installed", file=sys.stderr)
+    return backends
+
+def build_cases(backends):
+    """Yield (benchmark name, fixture name, fixture text, callable) for every case to time"""
+    serps = load_fixtures("serp_")
+    articles = load_fixtures("article_")
+
+    for backend in backends:
+        for name, html in serps:
+            yield f"parse_search_results[{backend.name}]", name, html, lambda html=html, backend=backend: \
+                parse_search_results(html, backend=backend)
+        for name, html in articles:
+            yield f"extract_title_and_text[{backend.name}]", name, html, lambda html=html, backend=backend: \
+                extract_title_and_text(html, backend=backend)
+            yield f"extract_main_content[{backend.name}]", name, html, lambda html=html, backend=backend: \
+                extract_main_content(html, backend=backend)
+
+    # Text cleanup and keyword counting run on parser output, so time them on
+    # text extracted once up front rather than on raw HTML
+    if backends:
+        for name, html in articles:
+            _, text = extract_title_and_text(html, backend=backends[0])
+            yield "clean_page_text", name, text, lambda text=text: clean_page_text(text)
+
+    # BM25 keywords are scored against an index of the article fixtures' main
+    # content, which is what the assistant indexes, not their raw HTML
+    index = KeywordIndex(":memory:")
+    for name, html in articles:
+        index.add_document(extract_main_content(html)["text"], key=name)
+    for name, text in load_fixtures("response"):
+        yield "top_keywords", name, text, lambda text=text: top_keywords(text)
+        yield "keyword_index.keywords", name, text, lambda text=text: index.keywords(text)
+
+def time_case(function, min_time, repeat):
+    """Return the per-call times of `repeat` rounds, each looping long enough to last min_time"""
+    # Calibrate how many calls make one round measurable
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            function()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        loops *= 2
+
+    timings = [elapsed / loops]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            function()
+        timings.append((time.perf_counter() - started) / loops)
+    return timings
+
+def peak_memory(function):
+    """Peak bytes allocated by Python during one call"""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(backends, min_time=0.2, repeat=5, pattern=None):
+    results = []
+    for benchmark, fixture, payload, function in build_cases(backends):
+        if pattern and pattern not in benchmark:
+            continue
+        timings = time_case(function, min_time, repeat)
+        best = min(timings)
+        size = len(payload.encode("utf-8"))
+        results.append({
+            "benchmark": benchmark,
+            "fixture": fixture,
+            "bytes": size,
+            "best_ms": best * 1000,
+            "median_ms": statistics.median(timings) * 1000,
+            "pages_per_s": 1 / best,
+            "mb_per_s": size / best / 1e6,
+            "peak_kb": peak_memory(function) / 1024,
+        })
+        print_row(results[-1])
+    return results
+
+def print_header():
+    print(f"{'benchmark':<36} {'fixture':<24} {'KB':>8} {'best ms':>9} {'median ms':>10} "
+          f"{'pages/s':>9} {'MB/s':>8} {'peak KB':>9}")
+
+def print_row(row):
+    print(f"{row['benchmark']:<36} {row['fixture']:<24} {row['bytes'] / 1024:>8.1f} {row['best_ms']:>9.3f} "
+          f"{row['median_ms']:>10.3f} {row['pages_per_s']:>9.1f} {row['mb_per_s']:>8.2f} {row['peak_kb']:>9.0f}")
+
+def compare(results, baseline_path):
+    """Print the change in best time against a JSON report from an earlier run"""
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline = {(row["benchmark"], row["fixture"]): row for row in json.load(baseline_file)["results"]}
+    print(f"\nCompared with {baseline_path}:")
+    for row in results:
+        before = baseline.get((row["benchmark"], row["fixture"]))
+        if before:
+            change = (row["best_ms"] - before["best_ms"]) / before["best_ms"] * 100
+            print(f"{row['benchmark']:<36} {row['fixture']:<24} {before['best_ms']:>9.3f} -> "
+                  f"{row['best_ms']:>9.3f} ms ({change:+.1f}%)")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Offline benchmarks for result extraction and text cleanup')
+    parser.add_argument('--backend', action='append', choices=list(BACKENDS), default=None,
+                        help='Parser backend to benchmark (repeatable, default: every installed backend)')
+    parser.add_argument('--filter', default=None, metavar='TEXT',
+                        help='Only run benchmarks whose name contains TEXT')
+    parser.add_argument('--min-time', type=float, default=0.2, metavar='SECONDS',
+                        help='Minimum duration of one timing round (default: 0.2)')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing rounds per case (default: 5)')
+    parser.add_argument('--json', metavar='FILE', default=None,
+                        help='Write the results as JSON so they can be compared across commits')
+    parser.add_argument('--compare', metavar='FILE', default=None,
+                        help='Compare against a JSON report written by an earlier --json run')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    backends = available_backends(args.backend)
+
+    print_header()
+    results = run(backends, min_time=args.min_time, repeat=args.repeat, pattern=args.filter)
+
+    if args.json:
+        report = {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+        print(f"\nResults written to {args.json}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
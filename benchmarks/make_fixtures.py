@@ -0,0 +1,324 @@
+import os
+import base64
+import random
+import argparse
+import urllib.parse
+
+# Regenerates the benchmark fixtures in fixtures/. The pages are built from a
+# fixed seed, so a rerun gives byte-identical files, and they are shaped after
+# captured Google result pages and news articles with the volatile parts
+# (tokens, tracking ids, personal data) replaced: a head full of inline CSS,
+# large inline scripts, data: URI thumbnails, ads, "People also ask" blocks and
+# page chrome around the content the extractors look for.
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+DEFAULT_SEED = 20240517
+
+QUERIES = [
+    "selenium chromedriver version mismatch", "python html parser performance",
+    "headless chrome remote debugging port", "lxml vs beautifulsoup speed",
+    "chrome for testing download", "scrape search results python",
+]
+
+SUBJECTS = [
+    "the parser", "ChromeDriver", "the new release", "a headless browser", "this approach",
+    "the benchmark", "lxml", "BeautifulSoup", "the remote debugging protocol", "each worker",
+    "the extraction step", "our test suite", "the page cache", "Chrome for Testing", "the script",
+]
+VERBS = [
+    "parses", "downloads", "renders", "blocks", "times out on", "retries", "caches",
+    "skips", "handles", "reports", "streams", "rejects", "matches", "speeds up", "waits for",
+]
+OBJECTS = [
+    "the search results page", "malformed markup", "every request", "a stale session",
+    "large documents", "the DOM tree", "dynamic content", "the driver binary",
+    "nested tables", "the first response byte", "the whole batch", "unicode text",
+    "each result snippet", "redirect links", "the version manifest",
+]
+TAILS = [
+    "in under a second", "on most machines", "without a browser", "when the page is cached",
+    "after the last update", "in our measurements", "with default settings",
+    "on Linux and Windows", "for pages over a megabyte", "once the network is idle",
+]
+OPENERS = ["In practice,", "As a rule,", "By default,", "In our tests,", "Unfortunately,",
+           "Since version 115,", "On a cold cache,", "With JavaScript disabled,"]
+
+SITES = [
+    ("stackoverflow.com", "Stack Overflow"), ("github.com", "GitHub"), ("docs.python.org", "Python docs"),
+    ("realpython.com", "Real Python"), ("medium.com", "Medium"), ("selenium.dev", "Selenium"),
+    ("developer.chrome.com", "Chrome for Developers"), ("lxml.de", "lxml"), ("reddit.com", "Reddit"),
+    ("dev.to", "DEV Community"), ("pypi.org", "PyPI"), ("news.ycombinator.com", "Hacker News"),
+]
+
+CSS_PROPERTIES = [
+    ("color", ["#202124", "#4d5156", "#1a0dab", "#70757a", "#681da8", "rgba(0,0,0,.54)"]),
+    ("font-size", ["12px", "14px", "16px", "20px", "22px", "0.875rem"]),
+    ("line-height", ["1.3", "1.58", "20px", "22px", "normal"]),
+    ("margin", ["0", "0 0 4px", "8px 0", "0 auto", "16px 0 0"]),
+    ("padding", ["0", "4px 8px", "12px 16px", "0 0 12px"]),
+    ("display", ["block", "inline-block", "flex", "none", "-webkit-box"]),
+    ("overflow", ["hidden", "visible", "auto"]),
+    ("border-radius", ["4px", "8px", "50%", "18px"]),
+    ("max-width", ["600px", "652px", "100%", "calc(100% - 48px)"]),
+    ("white-space", ["nowrap", "normal", "pre-wrap"]),
+]
+
+def sentence(rng):
+    words = f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}"
+    if rng.random() < 0.6:
+        words += f" {rng.choice(TAILS)}"
+    if rng.random() < 0.25:
+        words = f"{rng.choice(OPENERS)} {words}"
+    if rng.random() < 0.2:
+        words += f", and {rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}"
+    return words[0].upper() + words[1:] + rng.choice([".", ".", ".", ".", "?", "!"])
+
+def prose(rng, sentences):
+    return " ".join(sentence(rng) for _ in range(sentences))
+
+def class_name(rng):
+    """An obfuscated class name like the ones Google ships, e.g. "VwiC3b" """
+    letters = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return rng.choice(letters) + "".join(rng.choice(letters + "0123456789") for _ in range(rng.randint(4, 6)))
+
+def stylesheet(rng, rules):
+    lines = []
+    for _ in range(rules):
+        selector = ",".join("." + class_name(rng) + rng.choice(["", "", " a", ":hover", " > div", "::after"])
+                            for _ in range(rng.randint(1, 3)))
+        declarations = ";".join(f"{name}:{rng.choice(values)}"
+                                for name, values in rng.sample(CSS_PROPERTIES, rng.randint(1, 5)))
+        lines.append(f"{selector}{{{declarations}}}")
+    return "<style>" + "".join(lines) + "</style>"
+
+def script(rng, statements):
+    """Minified-looking JavaScript: short helpers, config tables and string arrays"""
+    parts = []
+    for _ in range(statements):
+        kind = rng.random()
+        name = class_name(rng)
+        if kind < 0.4:
+            args = ",".join(rng.sample("abcdefgh", rng.randint(1, 3)))
+            parts.append(f"var {name}=function({args}){{return {args[0]}&&{args[0]}.{class_name(rng)}"
+                         f"?{args[0]}.{class_name(rng)}({rng.randint(0, 999)}):void 0}};")
+        elif kind < 0.7:
+            values = ",".join(str(rng.randint(0, 99999)) for _ in range(rng.randint(4, 24)))
+            parts.append(f"{name}=[{values}];")
+        else:
+            values = ",".join(f'"{class_name(rng)}":"{base64.b64encode(rng.randbytes(rng.randint(6, 30))).decode()}"'
+                              for _ in range(rng.randint(2, 10)))
+            parts.append(f"window.{name}={{{values}}};")
+    return "<script nonce=\"" + base64.b64encode(rng.randbytes(16)).decode() + "\">" + "".join(parts) + "</script>"
+
+def thumbnail(rng, min_bytes=600, max_bytes=4000):
+    """A data: URI image of random bytes, standing in for the inlined result thumbnails"""
+    return "data:image/jpeg;base64," + base64.b64encode(rng.randbytes(rng.randint(min_bytes, max_bytes))).decode()
+
+def result_url(rng):
+    domain, site = rng.choice(SITES)
+    path = "/".join(rng.choice(["questions", "blog", "docs", "wiki", "p", "en", "2024", "latest"]) +
+                    "/" + "-".join(rng.choice(OBJECTS).split()[-1:] + [str(rng.randint(1000, 99999))])
+                    for _ in range(rng.randint(1, 2)))
+    return f"https://{domain}/{path}", domain, site
+
+def result_link(rng, url, redirect):
+    """The result href: plain, or Google's /url?q= click redirect as served without JavaScript"""
+    if not redirect:
+        return url
+    return "/url?" + urllib.parse.urlencode({"q": url, "sa": "U", "ved": class_name(rng) + class_name(rng),
+                                             "usg": base64.urlsafe_b64encode(rng.randbytes(18)).decode()})
+
+def result_title(rng):
+    return rng.choice(["How to", "Why", "Fixing:", "Guide:", ""]) + " " + \
+        rng.choice(SUBJECTS).replace("the ", "") + " " + rng.choice(VERBS) + " " + rng.choice(OBJECTS)
+
+def header_block(rng, url, domain, site, with_thumbnail):
+    icon = f'<img class="XNo5Ab" src="{thumbnail(rng, 200, 600)}" alt="" height="18" width="18">' \
+        if with_thumbnail else ""
+    crumbs = " › ".join(urllib.parse.urlsplit(url).path.strip("/").split("/"))
+    return (f'<div class="CA5RN"><div>{icon}<span class="VuuXrf">{site}</span></div>'
+            f'<div class="byrV5b"><cite class="qLRx3b tjvcx GvPZzd cHaqb" role="text">https://{domain}'
+            f'<span class="dyjrff ob9lvb" role="text"> › {crumbs}</span></cite></div></div>')
+
+def organic_result(rng, layout, redirect):
+    """One organic result in the given layout:
+
+    g        div.g > div.tF2Cxc > div.yuRUbf + div.VwiC3b (the layout most pages use)
+    tF2Cxc   div.MjjYud > div.tF2Cxc > div.yuRUbf + span.aCOpRe, with no div.g
+    yuRUbf   div.yuRUbf with the title and link only, the snippet outside it
+    """
+    url, domain, site = result_url(rng)
+    href = result_link(rng, url, redirect)
+    title = result_title(rng)
+    date = f'<span class="LEwnzc Sqrs4e"><span>{rng.randint(1, 28)} Mar {rng.randint(2018, 2024)}</span> — </span>' \
+        if rng.random() < 0.4 else ""
+    snippet_text = prose(rng, rng.randint(1, 3))
+    heading = (f'<a jsname="UWckNb" href="{href}" data-ved="{class_name(rng)}"><br>'
+               f'<h3 class="LC20lb MBeuO DKV0Md">{title}</h3>'
+               f'{header_block(rng, url, domain, site, rng.random() < 0.7)}</a>')
+    sitelinks = ""
+    if rng.random() < 0.15:
+        sitelinks = '<div class="HiHjCd">' + " · ".join(
+            f'<a href="{result_link(rng, result_url(rng)[0], redirect)}">{rng.choice(OBJECTS).title()}</a>'
+            for _ in range(rng.randint(2, 4))) + "</div>"
+
+    if layout == "g":
+        return (f'<div class="g Ww4FFb vt6azd tF2Cxc asEBEc" data-hveid="{class_name(rng)}" lang="en">'
+                f'<div class="N54PNb BToiNc cvP2Ce" data-snc="{class_name(rng)}">'
+                f'<div class="kb0PBd cvP2Ce A9Y9g jGGQ5e" data-snf="x5WNvb"><div class="yuRUbf"><div>'
+                f'<span jscontroller="msmzHf">{heading}</span></div></div></div>'
+                f'<div class="kb0PBd cvP2Ce A9Y9g" data-sncf="1"><div class="VwiC3b yXK7lf lVm3ye r025kc hJNv6b Hdw6tb" '
+                f'style="-webkit-line-clamp:2">{date}<span>{snippet_text}</span></div>{sitelinks}</div></div></div>')
+    if layout == "tF2Cxc":
+        return (f'<div class="MjjYud"><div jscontroller="SC7lYd" class="tF2Cxc asEBEc" data-hveid="{class_name(rng)}">'
+                f'<div class="yuRUbf">{heading}</div>'
+                f'<div class="IsZvec"><span class="aCOpRe">{date}<span>{snippet_text}</span></span>{sitelinks}</div>'
+                f'</div></div>')
+    return (f'<div class="MjjYud"><div class="Ww4FFb"><div class="yuRUbf">{heading}</div>'
+            f'<div class="IsZvec"><div class="lyLwlc">{date}{snippet_text}</div>{sitelinks}</div></div></div>')
+
+def ad_block(rng, redirect):
+    ads = []
+    for _ in range(rng.randint(2, 4)):
+        url, domain, site = result_url(rng)
+        ads.append(f'<div class="uEierd"><div class="v5yQqb"><a class="sVXRqc" href="{result_link(rng, url, redirect)}" '
+                   f'data-pcu="{url}"><div role="heading" class="CCgQ5 vCa9Yd QfkTvb N8QANc MUxGbd">'
+                   f'<span>{result_title(rng)}</span></div><span class="x2VHCd OSrXXb ob9lvb">{domain}</span></a></div>'
+                   f'<div class="MUxGbd yDYNvb lyLwlc">{prose(rng, 2)}</div></div>')
+    return f'<div id="tads" aria-label="Ads" role="region"><h1 class="bNg8Rb">Ads</h1>{"".join(ads)}</div>'
+
+def people_also_ask(rng):
+    questions = []
+    for _ in range(rng.randint(3, 5)):
+        question = rng.choice(["How do I", "Why does", "Can", "What is the best way to make"]) + " " + \
+            rng.choice(SUBJECTS).replace("the ", "") + " " + rng.choice(VERBS).rstrip("s") + " " + rng.choice(OBJECTS) + "?"
+        questions.append(f'<div class="related-question-pair" data-q="{question}"><div jsname="yEVEwb" role="button">'
+                         f'<div class="JlqpRe"><span>{question}</span></div></div>'
+                         f'<div jsname="ARU61" class="bCOlv" style="display:none"><div class="wDYxhc">{prose(rng, 3)}'
+                         f'</div></div></div>')
+    return (f'<div class="ULSxyf"><div class="people-also-ask" jscontroller="{class_name(rng)}">'
+            f'<h2 class="bNg8Rb">People also ask</h2>{"".join(questions)}</div></div>')
+
+def related_searches(rng, query):
+    links = "".join(f'<a class="k8XOCe" href="/search?q={urllib.parse.quote_plus(query + " " + rng.choice(OBJECTS))}">'
+                    f'<div class="s75CSd">{query} <b>{rng.choice(OBJECTS)}</b></div></a>' for _ in range(8))
+    return f'<div id="botstuff"><div class="y6Uyqe"><h3 class="bNg8Rb">Related searches</h3>{links}</div></div>'
+
+def serp(rng, query, results, layout="g", redirect=False, styles=300, scripts=6, script_size=60):
+    """A result page with `results` organic results and the usual surrounding blocks"""
+    body = []
+    if rng.random() < 0.7:
+        body.append(ad_block(rng, redirect))
+    for position in range(results):
+        if position in (2, 12, 40, 75):
+            body.append(people_also_ask(rng))
+        body.append(organic_result(rng, layout, redirect))
+        if position % 10 == 9:
+            body.append(script(rng, script_size // 4))
+    head = [f'<meta charset="UTF-8"><title>{query} - Google Search</title>', stylesheet(rng, styles)]
+    head += [script(rng, script_size) for _ in range(scripts)]
+    return (f'<!doctype html><html itemscope="" itemtype="http://schema.org/SearchResultsPage" lang="en"><head>'
+            f'{"".join(head)}</head><body jsmodel="hspDDf"><div class="L3eUgb" data-hveid="1">'
+            f'<div class="o3j99 n1xJcf Ne6nSd"><form action="/search" role="search"><textarea class="gLFyf" '
+            f'name="q">{query}</textarea></form></div><div id="rcnt"><div id="center_col"><div id="search">'
+            f'<div data-async-context="query:{urllib.parse.quote(query)}"><div id="rso">{"".join(body)}</div></div>'
+            f'</div>{related_searches(rng, query)}</div><div id="rhs">{people_also_ask(rng)}</div></div>'
+            f'<div id="footcnt"><footer><div class="fbar">{prose(rng, 2)}</div></footer></div></div>'
+            f'{script(rng, script_size)}</body></html>')
+
+def nav(rng, links):
+    items = "".join(f'<li class="menu-item"><a href="/{rng.choice(OBJECTS).split()[-1]}/">{rng.choice(OBJECTS).title()}</a></li>'
+                    for _ in range(links))
+    return f'<nav class="site-nav" aria-label="Main"><ul class="menu">{items}</ul></nav>'
+
+def article_body(rng, sections):
+    parts = [f'<h1 class="entry-title">{result_title(rng)}</h1>',
+             f'<div class="byline">By <a href="/author/{class_name(rng).lower()}/" rel="author">Staff Writer</a> · '
+             f'{rng.randint(1, 28)} May {rng.randint(2019, 2024)}</div>']
+    for _ in range(sections):
+        parts.append(f"<h2>{rng.choice(SUBJECTS).title()} and {rng.choice(OBJECTS)}</h2>")
+        for _ in range(rng.randint(2, 5)):
+            kind = rng.random()
+            if kind < 0.65:
+                parts.append(f"<p>{prose(rng, rng.randint(3, 7))}</p>")
+            elif kind < 0.8:
+                parts.append("<ul>" + "".join(f"<li>{sentence(rng)}</li>" for _ in range(rng.randint(3, 6))) + "</ul>")
+            elif kind < 0.9:
+                parts.append(f'<figure class="wp-block-image"><img src="{thumbnail(rng)}" alt="{rng.choice(OBJECTS)}">'
+                             f"<figcaption>{sentence(rng)}</figcaption></figure>")
+            else:
+                parts.append(f"<blockquote><p>{prose(rng, 2)}</p></blockquote>")
+    return "".join(parts)
+
+def comments(rng, count):
+    items = "".join(f'<li class="comment"><div class="comment-author">reader{rng.randint(1, 9999)}</div>'
+                    f'<div class="comment-content"><p>{prose(rng, rng.randint(1, 3))}</p></div>'
+                    f'<a class="comment-reply-link" href="#respond">Reply</a></li>' for _ in range(count))
+    return f'<section id="comments" class="comments-area"><h2>{count} comments</h2><ol class="comment-list">{items}</ol></section>'
+
+def sidebar(rng, widgets):
+    blocks = "".join(f'<section class="widget"><h3 class="widget-title">{rng.choice(["Popular", "Related", "Latest"])}</h3><ul>'
+                     + "".join(f'<li><a href="/{class_name(rng).lower()}/">{result_title(rng)}</a></li>' for _ in range(6))
+                     + "</ul></section>" for _ in range(widgets))
+    return f'<aside id="secondary" class="sidebar widget-area">{blocks}</aside>'
+
+def article(rng, sections, comment_count, styles=400, scripts=4, script_size=80):
+    """A blog or news article: navigation, a sidebar, comments and tracking scripts around the text"""
+    head = [f'<meta charset="utf-8"><title>{result_title(rng)} | Example Tech Blog</title>', stylesheet(rng, styles)]
+    head += [script(rng, script_size) for _ in range(scripts)]
+    return (f'<!DOCTYPE html><html lang="en-US"><head>{"".join(head)}</head><body class="post-template">'
+            f'<div class="cookie-banner">{prose(rng, 2)} <button>Accept</button></div>'
+            f'<header class="site-header"><a class="logo" href="/">Example Tech Blog</a>{nav(rng, 12)}</header>'
+            f'<div id="content" class="site-content"><main id="main" class="site-main"><article class="post">'
+            f'<div class="entry-content">{article_body(rng, sections)}</div>'
+            f'<div class="share-buttons">{nav(rng, 5)}</div></article>{comments(rng, comment_count)}</main>'
+            f'{sidebar(rng, 3)}</div><footer class="site-footer">{nav(rng, 20)}<p>{prose(rng, 2)}</p></footer>'
+            f'{script(rng, script_size)}</body></html>')
+
+def analysis_response(rng, points):
+    """A reply in the shape the analysis model returns: numbered points, then a summary"""
+    lines = ["## Analysis", ""]
+    for number in range(1, points + 1):
+        lines += [f"{number}. **{rng.choice(SUBJECTS).title()}**: {prose(rng, rng.randint(2, 4))}", ""]
+    lines += ["## Summary", "", prose(rng, 6), ""]
+    return "\n".join(lines)
+
+# name -> how to build it; every entry gets its own generator seeded from the
+# name, so adding or resizing one fixture leaves the others unchanged
+FIXTURES = {
+    "serp_small.html": lambda rng: serp(rng, QUERIES[0], results=10),
+    "serp_large.html": lambda rng: serp(rng, QUERIES[1], results=100, styles=1200, scripts=12, script_size=200),
+    # Several megabytes, like a result page with 100 results and every inline module loaded
+    "serp_huge.html": lambda rng: serp(rng, QUERIES[2], results=100, styles=4000, scripts=30, script_size=600),
+    # Layouts without div.g, which only the fallback selectors find
+    "serp_layout_tf2cxc.html": lambda rng: serp(rng, QUERIES[3], results=20, layout="tF2Cxc", styles=600),
+    # Served without JavaScript: /url?q= redirect links and no snippet in the container
+    "serp_layout_yurubf.html": lambda rng: serp(rng, QUERIES[4], results=20, layout="yuRUbf", redirect=True),
+    "article_small.html": lambda rng: article(rng, sections=4, comment_count=5),
+    "article_large.html": lambda rng: article(rng, sections=100, comment_count=150, styles=1500, scripts=10),
+    "response.txt": lambda rng: analysis_response(rng, points=50),
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Regenerate the benchmark fixtures')
+    parser.add_argument('--output', default=FIXTURES_DIR, metavar='DIR',
+                        help='Directory to write the fixtures to (default: benchmarks/fixtures)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help='Base random seed; change it to get a different corpus of the same shape')
+    parser.add_argument('names', nargs='*', help='Fixtures to write (default: all)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    os.makedirs(args.output, exist_ok=True)
+    for name in args.names or FIXTURES:
+        if name not in FIXTURES:
+            raise SystemExit(f"Unknown fixture {name}; choose from {', '.join(FIXTURES)}")
+        text = FIXTURES[name](random.Random(f"{args.seed}:{name}"))
+        with open(os.path.join(args.output, name), "w", encoding="utf-8", newline="\n") as fixture:
+            fixture.write(text)
+        print(f"{name}: {len(text.encode('utf-8')) / 1024:.1f} KB")
+
+if __name__ == "__main__":
+    main()
@@ -4,28 +4,92 @@ import platform
 import webbrowser
 import urllib.parse
 import time
+import argparse
+import itertools
 import requests
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
 
-def extract_search_results_and_send_to_deepseek():
-    """Open a Google search, extract the results, and send to DeepSeek"""
-    # Get user input for search
-    search_query = input("Enter your search query: ")
-    
-    # Encode the query for URL
-    encoded_query = urllib.parse.quote(search_query)
-    
-    # Create the Google search URL
-    google_url = f"https://www.google.com/search?q={encoded_query}"
-    
-    print(f"Opening Google search for: {search_query}")
+# Selenium is imported where a browser is actually started, so cached results
+# can be served without paying for the import
+
+# Shared helpers live alongside the other tools in the backup directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backup"))
+from serp_extraction import extract_search_results, parse_search_results
+from result_formatting import FORMATS, format_results, write_results
+from text_injection import INPUT_METHODS, insert_text
+from batch_search import read_queries, run_batch
+from browser_daemon import connect_to_daemon
+from serp_cache import DEFAULT_TTL, open_cache
+from http_fetch import FETCH_MODES, fetch_serp_over_http
+
+# Selector for a single organic result, counted while the results page settles
+RESULT_SELECTOR = "div.g"
+
+# Runs inside the page: keeps scrolling while new result nodes show up and
+# calls back once none have appeared for the quiet window, once the target
+# number of results is present, or when the hard timeout expires
+SETTLE_SCRIPT = """
+const quietMs = arguments[0], maxResults = arguments[1], timeoutMs = arguments[2];
+const selector = arguments[3], done = arguments[arguments.length - 1];
+const count = () => document.querySelectorAll(selector).length;
+let lastCount = count(), quietTimer = null, finished = false, observer = null;
+const finish = () => {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    clearTimeout(quietTimer);
+    clearTimeout(hardTimer);
+    done(count());
+};
+const armQuietTimer = () => {
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(finish, quietMs);
+};
+const hardTimer = setTimeout(finish, timeoutMs);
+if (maxResults && lastCount >= maxResults) {
+    finish();
+} else {
+    observer = new MutationObserver(() => {
+        const current = count();
+        if (current === lastCount) return;
+        lastCount = current;
+        if (maxResults && current >= maxResults) return finish();
+        window.scrollTo(0, document.body.scrollHeight);
+        armQuietTimer();
+    });
+    observer.observe(document.body, {childList: true, subtree: true});
+    window.scrollTo(0, document.body.scrollHeight);
+    armQuietTimer();
+}
+"""
+
+def wait_for_results_to_settle(driver, quiet_window=0.75, max_results=None, timeout=30):
+    """Scroll the results page until no new results appear for quiet_window seconds"""
+    # The in-page observer does the waiting, so this is a single round trip
+    # to chromedriver instead of a fixed sleep per scroll
+    driver.set_script_timeout(timeout + 5)
+    return driver.execute_async_script(
+        SETTLE_SCRIPT,
+        int(quiet_window * 1000),
+        max_results or 0,
+        int(timeout * 1000),
+        RESULT_SELECTOR
+    )
+
+def find_chromedriver():
+    """Return the path of chromedriver in the current or backup directory, or None"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    chromedriver_name = "chromedriver.exe" if platform.system() == "Windows" else "chromedriver"
+    for directory in (current_dir, os.path.join(current_dir, "backup")):
+        chromedriver_path = os.path.join(directory, chromedriver_name)
+        if os.path.exists(chromedriver_path):
+            return chromedriver_path
+    return None
+
+def create_chrome_driver():
+    """Start Chrome with the user's default profile, or return None if ChromeDriver is missing"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
     
     # Set up Chrome options for selenium
     chrome_options = Options()
@@ -39,97 +103,152 @@ def extract_search_results_and_send_to_deepseek():
             chrome_options.add_argument(f'--user-data-dir={default_profile_path}')
             chrome_options.add_argument('--profile-directory=Default')
     
+    chromedriver_path = find_chromedriver()
+    if not chromedriver_path:
+        return None
+    
+    # Initialize the Chrome driver with the options
+    service = Service(executable_path=chromedriver_path)
+    return webdriver.Chrome(service=service, options=chrome_options)
+
+def clean_results(raw_results):
+    """Replace missing fields with placeholders so every result formats the same way"""
+    return [
+        {
+            "title": result["title"] or "No title found",
+            "link": result["link"] or "No link found",
+            "snippet": result["snippet"] or "No snippet found"
+        }
+        for result in raw_results
+    ]
+
+def ask(prompt):
+    """input() with the prompt on stderr, so it never mixes with results streamed to stdout"""
+    print(prompt, end="", file=sys.stderr, flush=True)
+    return input()
+
+def write_output(search_query, search_results, output_format, output_path):
+    """Stream the formatted results to the requested output as they are formatted"""
+    if output_path == "-":
+        write_results(search_query, search_results, sys.stdout, output_format)
+    elif output_path:
+        with open(output_path, "w", encoding="utf-8") as output_file:
+            write_results(search_query, search_results, output_file, output_format)
+        print(f"Results written to {output_path}", file=sys.stderr)
+
+def extract_search_results_and_send_to_deepseek(max_results=None, quiet_window=0.75, output_format="text",
+                                                output_path=None, send_to_deepseek=True, input_method="fast",
+                                                use_daemon=False, cache=None, refresh=False, fetch_mode="auto"):
+    """Open a Google search, extract the results, and send to DeepSeek"""
+    # Without DeepSeek the results have nowhere else to go
+    if not send_to_deepseek and output_path is None:
+        output_path = "-"
+    
+    # Get user input for search
+    search_query = ask("Enter your search query: ")
+    
+    # Encode the query for URL
+    encoded_query = urllib.parse.quote(search_query)
+    
+    # Create the Google search URL
+    google_url = f"https://www.google.com/search?q={encoded_query}"
+    
+    print(f"Opening Google search for: {search_query}", file=sys.stderr)
+    
+    # A cached result list answers the query without a browser
+    search_results = None
+    if cache and not refresh:
+        cached_results = cache.get(search_query, max_results=max_results)
+        if cached_results is not None:
+            search_results = clean_results(cached_results)
+            print(f"Using {len(search_results)} cached search results.", file=sys.stderr)
+            write_output(search_query, search_results, output_format, output_path)
+            if not send_to_deepseek:
+                return
+    
+    # A plain HTTP request is enough whenever Google serves the results without a script challenge
+    if search_results is None and fetch_mode != "browser":
+        http_results = fetch_serp_over_http(search_query, max_results=max_results)
+        if http_results:
+            if cache:
+                cache.put(search_query, http_results, max_results=max_results)
+            search_results = clean_results(http_results)
+            print(f"Extracted {len(search_results)} search results over HTTP.", file=sys.stderr)
+            write_output(search_query, search_results, output_format, output_path)
+            if not send_to_deepseek:
+                return
+        elif fetch_mode == "http":
+            print("Google didn't return results over HTTP.", file=sys.stderr)
+            return
+        else:
+            print("Google didn't return results over HTTP. Using the browser instead.", file=sys.stderr)
+    
+    # Without DeepSeek the results are all we need, which a warm daemon can provide
+    daemon = connect_to_daemon() if use_daemon and not send_to_deepseek else None
+    if daemon:
+        print(f"Using the browser daemon at {daemon.address}", file=sys.stderr)
+        raw_results = daemon.search_google(search_query, max_results=max_results)
+        if cache:
+            cache.put(search_query, raw_results, max_results=max_results)
+        search_results = clean_results(raw_results)
+        print(f"Extracted {len(search_results)} search results.", file=sys.stderr)
+        write_output(search_query, search_results, output_format, output_path)
+        return
+    
     # Initialize Chrome driver
     try:
-        # Find chromedriver.exe in the current directory or backup
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        chromedriver_name = "chromedriver.exe" if platform.system() == "Windows" else "chromedriver"
-        chromedriver_path = os.path.join(current_dir, chromedriver_name)
-        
-        # Check if chromedriver is in the backup directory
-        if not os.path.exists(chromedriver_path):
-            backup_path = os.path.join(current_dir, "backup", chromedriver_name)
-            if os.path.exists(backup_path):
-                chromedriver_path = backup_path
-        
-        # If chromedriver is still not found, use default behavior with webbrowser
-        if not os.path.exists(chromedriver_path):
-            print("ChromeDriver not found. Using default browser instead.")
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        driver = create_chrome_driver()
+        
+        # If chromedriver is not found, use default behavior with webbrowser
+        if driver is None:
+            print("ChromeDriver not found. Using default browser instead.", file=sys.stderr)
             # Open the URL in the default browser
             webbrowser.open(google_url)
-            print("Search opened in default browser. Script can't extract data without ChromeDriver.")
+            print("Search opened in default browser. Script can't extract data without ChromeDriver.", file=sys.stderr)
             return
-            
-        # Initialize the Chrome driver with the options
-        service = Service(executable_path=chromedriver_path)
-        driver = webdriver.Chrome(service=service, options=chrome_options)
         
-        # Navigate to Google
-        driver.get(google_url)
+        # Search Google unless the results came from the cache
+        if search_results is None:
+            # Navigate to Google
+            driver.get(google_url)
         
-        # Wait for the search results to load
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "search")))
+            # Wait for the search results to load
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "search")))
         
-        print("Search results loaded. Scrolling to extract all results...")
+            print("Search results loaded. Scrolling to extract all results...", file=sys.stderr)
         
-        # Scroll down to the bottom of the page to load all results
-        last_height = driver.execute_script("return document.body.scrollHeight")
-        while True:
-            # Scroll down to bottom
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            
-            # Wait to load page
-            time.sleep(2)
-            
-            # Calculate new scroll height and compare with last scroll height
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                break
-            last_height = new_height
-            
-            print("Scrolling... found more results.")
-        
-        # Extract all search results
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, 'html.parser')
-        
-        # Extract title, links and snippets
-        search_results = []
-        
-        # Look for result containers
-        results = soup.select("div.g")
-        if not results:  # Try alternative selectors if the first one doesn't work
-            results = soup.select("div.tF2Cxc")
-        if not results:
-            results = soup.select("div.yuRUbf")
-        
-        for result in results:
-            title_elem = result.select_one("h3")
-            link_elem = result.select_one("a")
-            snippet_elem = result.select_one("div.VwiC3b") or result.select_one("span.aCOpRe")
-            
-            title = title_elem.text if title_elem else "No title found"
-            link = link_elem['href'] if link_elem and 'href' in link_elem.attrs else "No link found"
-            snippet = snippet_elem.text if snippet_elem else "No snippet found"
-            
-            search_results.append({
-                "title": title,
-                "link": link,
-                "snippet": snippet
-            })
+            # Scroll until no new results show up (or we have enough of them)
+            result_count = wait_for_results_to_settle(driver, quiet_window=quiet_window, max_results=max_results)
+            print(f"Results settled with {result_count} result blocks on the page.", file=sys.stderr)
+        
+            # Extract title, link and snippet of every result inside the page
+            try:
+                raw_results = extract_search_results(driver, max_results=max_results)
+            except Exception as e:
+                print(f"In-page extraction failed ({e}). Parsing the page source instead...", file=sys.stderr)
+                raw_results = parse_search_results(driver.page_source, max_results=max_results,
+                                                   base_url=driver.current_url)
         
-        print(f"Extracted {len(search_results)} search results.")
+            if cache:
+                cache.put(search_query, raw_results, max_results=max_results)
+            search_results = clean_results(raw_results)
         
-        # Format the extracted data
-        formatted_data = f"Google Search Results for: {search_query}\n\n"
+            print(f"Extracted {len(search_results)} search results.", file=sys.stderr)
         
-        for i, result in enumerate(search_results, 1):
-            formatted_data += f"Result {i}:\n"
-            formatted_data += f"Title: {result['title']}\n"
-            formatted_data += f"Link: {result['link']}\n"
-            formatted_data += f"Snippet: {result['snippet']}\n\n"
+            write_output(search_query, search_results, output_format, output_path)
         
-        print("Opening DeepSeek chat...")
+        if not send_to_deepseek:
+            driver.quit()
+            return
+        
+        # Format the extracted data (joined once rather than concatenated per result)
+        formatted_data = "".join(format_results(search_query, search_results, output_format))
+        
+        print("Opening DeepSeek chat...", file=sys.stderr)
         
         # Open DeepSeek in a new tab
         driver.execute_script("window.open('https://chat.deepseek.com/', '_blank');")
@@ -148,9 +267,9 @@ def extract_search_results_and_send_to_deepseek():
             
             # Check if we need to login
             if "Sign in" in driver.page_source or "Log in" in driver.page_source:
-                print("\nDeepSeek requires login. Please log in manually.")
-                print("After logging in, the script will paste the search results.")
-                input("Press Enter after logging in to continue...")
+                print("\nDeepSeek requires login. Please log in manually.", file=sys.stderr)
+                print("After logging in, the script will paste the search results.", file=sys.stderr)
+                ask("Press Enter after logging in to continue...")
                 
                 # Refresh the page after login
                 driver.refresh()
@@ -164,39 +283,152 @@ def extract_search_results_and_send_to_deepseek():
             # Click the textarea and paste the data
             textarea.click()
             
-            # Type the formatted data in chunks to avoid issues with large text
-            chunk_size = 1000
-            for i in range(0, len(formatted_data), chunk_size):
-                chunk = formatted_data[i:i+chunk_size]
-                textarea.send_keys(chunk)
-                time.sleep(0.5)  # Small delay between chunks
+            # Put the whole prompt into the textarea in one operation
+            insert_text(driver, textarea, formatted_data, method=input_method)
             
-            print("Search results pasted into DeepSeek. You can now send the message manually.")
+            print("Search results pasted into DeepSeek. You can now send the message manually.", file=sys.stderr)
             
             # Keep the browser window open
-            input("Press Enter to close the browser and exit...")
+            ask("Press Enter to close the browser and exit...")
             
         except Exception as e:
-            print(f"Error interacting with DeepSeek: {e}")
-            print("The browser window will stay open so you can manually interact with it.")
-            input("Press Enter to close the browser and exit...")
+            print(f"Error interacting with DeepSeek: {e}", file=sys.stderr)
+            print("The browser window will stay open so you can manually interact with it.", file=sys.stderr)
+            ask("Press Enter to close the browser and exit...")
         
         # Close the browser when done
         driver.quit()
         
     except Exception as e:
-        print(f"Error opening browser with selenium: {e}")
-        print("Falling back to default browser...")
+        print(f"Error opening browser with selenium: {e}", file=sys.stderr)
+        print("Falling back to default browser...", file=sys.stderr)
         webbrowser.open(google_url)
-        print("Search opened in default browser.")
+        print("Search opened in default browser.", file=sys.stderr)
+
+def run_batch_search(batch_path, concurrency=4, max_results=None, output_format="text", output_path=None,
+                     use_daemon=False, cache=None, refresh=False):
+    """Run every query in batch_path across several tabs of one browser and write results as they finish"""
+    output_file = open(output_path, "w", encoding="utf-8") if output_path and output_path != "-" else sys.stdout
+    completed = failed = cached = 0
+    started = time.monotonic()
+    driver = None
+    
+    def uncached_queries():
+        # Answer cached queries straight away and pass only the rest on to the browser
+        nonlocal completed, cached
+        for query in read_queries(batch_path):
+            cached_results = cache.get(query, max_results=max_results) if cache and not refresh else None
+            if cached_results is None:
+                yield query
+                continue
+            completed += 1
+            cached += 1
+            write_results(query, clean_results(cached_results), output_file, output_format)
+    
+    try:
+        queries = uncached_queries()
+        first_query = next(queries, None)
+        
+        # Only start (or contact) a browser once some query actually needs one
+        if first_query is not None:
+            queries = itertools.chain([first_query], queries)
+            
+            # A running daemon already has a warm browser, so hand it the whole batch
+            daemon = connect_to_daemon() if use_daemon else None
+            if daemon:
+                batch = daemon.search_many(queries, concurrency=concurrency, max_results=max_results)
+            else:
+                driver = create_chrome_driver()
+                if driver is None:
+                    print("ChromeDriver not found. Batch mode needs ChromeDriver to extract results.", file=sys.stderr)
+                    return
+                batch = run_batch(driver, queries, concurrency=concurrency, max_results=max_results)
+            
+            for query, raw_results, error in batch:
+                if error:
+                    failed += 1
+                    print(f"Query failed: {query} ({error})", file=sys.stderr)
+                    continue
+                completed += 1
+                if cache:
+                    cache.put(query, raw_results, max_results=max_results)
+                write_results(query, clean_results(raw_results), output_file, output_format)
+    finally:
+        if output_file is not sys.stdout:
+            output_file.close()
+        if driver is not None:
+            driver.quit()
+    
+    print(f"Batch finished: {completed} queries succeeded ({cached} from cache), {failed} failed "
+          f"in {time.monotonic() - started:.1f}s", file=sys.stderr)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Enhanced Chrome Search')
+    parser.add_argument('--max-results', type=int, default=None, metavar='N',
+                        help='Stop scrolling once N results are on the page')
+    parser.add_argument('--quiet-window', type=float, default=0.75, metavar='SECONDS',
+                        help='Stop scrolling once no new results have appeared for this long (default: 0.75)')
+    parser.add_argument('--format', choices=FORMATS, default='text', dest='output_format',
+                        help='How to format the results (default: text)')
+    parser.add_argument('--output', metavar='FILE', default=None,
+                        help='Also write the formatted results to FILE as they are produced ("-" for stdout; '
+                             'the default with --no-deepseek). Status messages go to stderr')
+    parser.add_argument('--no-deepseek', action='store_true',
+                        help='Only extract and write the results, don\'t open DeepSeek')
+    parser.add_argument('--input-method', choices=INPUT_METHODS, default='fast',
+                        help='How the results are pasted into DeepSeek: fast/cdp/js insert the whole text at once, '
+                             'keys sends it in chunks, human types it character by character (default: fast)')
+    parser.add_argument('--fetch-mode', choices=FETCH_MODES, default='auto',
+                        help='auto tries a plain HTTP request for the results page before starting the browser, '
+                             'http never uses the browser for searching, browser always does (default: auto)')
+    parser.add_argument('--daemon', action='store_true',
+                        help='With --batch or --no-deepseek, use a running browser_daemon.py instead of starting Chrome')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Don\'t read or write the on-disk search result cache')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Ignore cached results but store the fresh ones')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL, metavar='SECONDS',
+                        help=f'How long cached results stay valid (default: {DEFAULT_TTL})')
+    parser.add_argument('--batch', metavar='FILE', default=None,
+                        help='Read one query per line from FILE ("-" for stdin) and run them all without DeepSeek')
+    parser.add_argument('--concurrency', type=int, default=4, metavar='N',
+                        help='Number of tabs used in parallel in batch mode (default: 4)')
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    print("Enhanced Chrome Search")
-    print("=====================")
-    print("This script will:")
-    print("1. Open Google search with your query")
-    print("2. Scroll down to extract all results")
-    print("3. Open DeepSeek and paste the results")
-    print("")
-    
-    extract_search_results_and_send_to_deepseek() 
\ No newline at end of file
+    args = parse_args()
+    cache = open_cache(enabled=not args.no_cache, ttl=args.cache_ttl)
+    
+    if args.batch:
+        run_batch_search(
+            args.batch,
+            concurrency=args.concurrency,
+            max_results=args.max_results,
+            output_format=args.output_format,
+            output_path=args.output,
+            use_daemon=args.daemon,
+            cache=cache,
+            refresh=args.refresh
+        )
+        sys.exit(0)
+    
+    print("Enhanced Chrome Search", file=sys.stderr)
+    print("=====================", file=sys.stderr)
+    print("This script will:", file=sys.stderr)
+    print("1. Open Google search with your query", file=sys.stderr)
+    print("2. Scroll down until the results settle and extract them", file=sys.stderr)
+    print("3. Open DeepSeek and paste the results", file=sys.stderr)
+    print(file=sys.stderr)
+    
+    extract_search_results_and_send_to_deepseek(
+        max_results=args.max_results,
+        quiet_window=args.quiet_window,
+        output_format=args.output_format,
+        output_path=args.output,
+        send_to_deepseek=not args.no_deepseek,
+        input_method=args.input_method,
+        use_daemon=args.daemon,
+        cache=cache,
+        refresh=args.refresh,
+        fetch_mode=args.fetch_mode
+    ) 
\ No newline at end of file
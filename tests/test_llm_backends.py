@@ -0,0 +1,68 @@
+import os
+import sys
+import unittest
+
+# The analyzers live in the backup directory alongside the scripts that use them
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backup"))
+import requests
+from llm_backends import Analyzer, HTTPChatAnalyzer
+from llm_stub_server import start_stub_server
+
+CONTENT = {"title": "Test page", "text": "Some page text.", "url": "http://example.com/page"}
+
+REPLY = "The page says several things, and all of them are covered in this reply."
+
+class HTTPChatAnalyzerTest(unittest.TestCase):
+    def start_server(self, **options):
+        server, base_url = start_stub_server(reply=REPLY, chunk_size=8, **options)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        analyzer = HTTPChatAnalyzer(base_url=base_url, model="stub", api_key="test-key", timeout=10)
+        self.addCleanup(analyzer.session.close)
+        self.server = server
+        return analyzer
+
+    def test_stream_yields_deltas(self):
+        analyzer = self.start_server()
+        deltas = list(analyzer.stream(CONTENT))
+        self.assertEqual(deltas, [REPLY[start:start + 8] for start in range(0, len(REPLY), 8)])
+
+    def test_analyze_returns_full_reply(self):
+        analyzer = self.start_server()
+        self.assertEqual(analyzer.analyze(CONTENT), REPLY)
+
+    def test_connection_is_reused(self):
+        analyzer = self.start_server()
+        self.assertEqual("".join(analyzer.stream(CONTENT)), REPLY)
+        self.assertEqual("".join(analyzer.stream(CONTENT)), REPLY)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_error_status_raises(self):
+        analyzer = self.start_server(status=500)
+        with self.assertRaises(requests.HTTPError) as raised:
+            list(analyzer.stream(CONTENT))
+        self.assertEqual(raised.exception.response.status_code, 500)
+
+    def test_error_status_is_reported_by_analyze(self):
+        analyzer = self.start_server(status=401)
+        self.assertTrue(analyzer.analyze(CONTENT).startswith("Error from the analysis API"))
+
+    def test_malformed_event_raises(self):
+        analyzer = self.start_server(malformed=True)
+        stream = analyzer.stream(CONTENT)
+        self.assertEqual(next(stream), REPLY[:8])
+        with self.assertRaises(ValueError):
+            next(stream)
+
+    def test_malformed_event_is_reported_by_analyze(self):
+        analyzer = self.start_server(malformed=True)
+        self.assertTrue(analyzer.analyze(CONTENT).startswith("Error from the analysis API"))
+
+class AnalyzerTest(unittest.TestCase):
+    def test_stream_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Analyzer()
+
+if __name__ == "__main__":
+    unittest.main()